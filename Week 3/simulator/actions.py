@@ -7,6 +7,7 @@ class PlaceLimit(Action):
         self.side = side
         self.price = price
         self.qty = qty
+        self.order_id = None  # set by the environment when the order is placed
 
 
 class PlaceMarket(Action):
@@ -19,3 +20,10 @@ class Cancel(Action):
     def __init__(self, order_id):
         self.order_id = order_id
         # NOTE: Cancels are assumed instantaneous in this model
+
+
+class Amend(Action):
+    # Cancel-replace of a resting order; the replacement joins the back of the queue
+    def __init__(self, order_id, limit):
+        self.order_id = order_id
+        self.limit = limit
@@ -1,45 +1,97 @@
 import random
 from abc import ABC, abstractmethod
-from actions import PlaceLimit, PlaceMarket, Cancel
-from collections import deque
+from actions import PlaceLimit, PlaceMarket
+from indicators import SMA
+from quoting import Quoter
+from market_config import MarketConfig
+from feed import TOP, TopOfBook
 
 # Removed arrival probability as large arrival rate also have same simulation effect
 
 class Agent(ABC):
+    # Market state fields read by get_action (None: any, read lazily);
+    # () means get_action ignores it and receives None
+    market_fields = None
+
     def __init__(self, agent_id, arrival_rate=1.0):
         self.agent_id = agent_id
         self.arrival_rate = arrival_rate
+        # Accounts are kept locally until a ledger.Ledger registers the agent
+        self.ledger = None
+        self.ledger_row = None
         self.balance = 0.0
         self.inventory = 0
         self.active_orders = {}
+        # Optional arrival stream (e.g. arrivals.SeasonalArrivals) replacing
+        # the homogeneous Poisson arrivals at arrival_rate
+        self.arrival_process = None
+        # Random source: the global `random` module unless an
+        # rng.RNGService assigns the agent its own stream
+        self.rng = random
 
     def next_event_time(self, current_time):
-        return current_time + random.expovariate(self.arrival_rate)
+        if self.arrival_process is not None:
+            return self.arrival_process.next_time(current_time)
+        return current_time + self.rng.expovariate(self.arrival_rate)
+
+    @property
+    def balance(self):
+        if self.ledger is not None:
+            return self.ledger.balance(self.ledger_row)
+        return self._balance
+
+    @balance.setter
+    def balance(self, value):
+        if self.ledger is not None:
+            raise AttributeError("balance is kept by the ledger")
+        self._balance = value
+
+    @property
+    def inventory(self):
+        if self.ledger is not None:
+            return self.ledger.inventory(self.ledger_row)
+        return self._inventory
+
+    @inventory.setter
+    def inventory(self, value):
+        if self.ledger is not None:
+            raise AttributeError("inventory is kept by the ledger")
+        self._inventory = value
 
     @abstractmethod
     def get_action(self, market_state):
         pass
 
     def on_trade(self, trade, side):
-        pass
+        # With a ledger the fill is booked there by the matching path
+        if self.ledger is not None:
+            return
+        if side == "BUY":
+            self._inventory += trade.qty
+            self._balance -= trade.price * trade.qty
+        else:
+            self._inventory -= trade.qty
+            self._balance += trade.price * trade.qty
 
 
 class RandomAgent(Agent):
     def get_action(self, market_state):
-        side = random.choice(["BUY", "SELL"])
+        side = self.rng.choice(["BUY", "SELL"])
 
-        if random.random() < 0.5:
-            qty = random.randint(1, 5)
+        if self.rng.random() < 0.5:
+            qty = self.rng.randint(1, 5)
             return PlaceMarket(side, qty)
 
         ref = market_state["mid"] if market_state["mid"] is not None else 100
-        price = ref + random.choice([-2, -1, 1, 2])
-        qty = random.randint(1, 5)
+        price = ref + self.rng.choice([-2, -1, 1, 2])
+        qty = self.rng.randint(1, 5)
 
         return PlaceLimit(side, price, qty)
 
 
 class MarketMakerAgent(Agent):
+    market_fields = ()
+
     def __init__(
         self,
         agent_id,
@@ -48,7 +100,8 @@ class MarketMakerAgent(Agent):
         base_spread=1.0,
         inventory_skew=0.1,
         max_inventory=20,
-        cash=100_000
+        cash=100_000,
+        tick_size=None
     ):
         super().__init__(agent_id, arrival_rate)
         self.fv = fair_value_process
@@ -56,6 +109,11 @@ class MarketMakerAgent(Agent):
         self.inventory_skew = inventory_skew
         self.max_inventory = max_inventory
         self.balance = cash
+        # Requotes only send what changed after rounding to the market tick;
+        # pass the MarketConfig.tick_size of the market the agent trades in
+        if tick_size is None:
+            tick_size = MarketConfig().tick_size
+        self.quoter = Quoter(tick_size)
 
     def get_action(self, market_state):
         # 🔑 Anchor to FAIR VALUE, not mid
@@ -71,36 +129,24 @@ class MarketMakerAgent(Agent):
         if bid >= ask:
             return None
 
-        actions = []
-
-        # Cancel previous quotes
-        for oid in list(self.active_orders):
-            actions.append(Cancel(oid))
-            del self.active_orders[oid]
-
+        quotes = {}
         qty = 1
 
         if self.inventory < self.max_inventory:
-            actions.append(PlaceLimit("BUY", bid, qty))
+            quotes["BUY"] = (bid, qty)
 
         if self.inventory > -self.max_inventory:
-            actions.append(PlaceLimit("SELL", ask, qty))
-
-        return actions
+            quotes["SELL"] = (ask, qty)
 
-    def on_trade(self, trade, side):
-        if side == "BUY":
-            self.inventory += trade.qty
-            self.balance -= trade.price * trade.qty
-        else:
-            self.inventory -= trade.qty
-            self.balance += trade.price * trade.qty
+        return self.quoter.update(self.active_orders, quotes)
 
 
 # no inventory updates
 class NoiseTraderAgent(Agent):
     # Zero-Intelligence trader with budget and inventory constraints.
 
+    market_fields = ()
+
     def __init__(self, agent_id, fair_value_process, arrival_rate=1.0, max_qty=5, cash=10_000):
         super().__init__(agent_id, arrival_rate)
         self.fair_value = fair_value_process
@@ -109,8 +155,8 @@ class NoiseTraderAgent(Agent):
         self.max_qty = max_qty
 
     def get_action(self, market_state):
-        side = random.choice(["BUY", "SELL"])
-        qty = random.randint(1, self.max_qty)
+        side = self.rng.choice(["BUY", "SELL"])
+        qty = self.rng.randint(1, self.max_qty)
 
         fv = self.fair_value.get()
 
@@ -121,23 +167,20 @@ class NoiseTraderAgent(Agent):
             return None
 
         # 70% market, 30% aggressive limit
-        if random.random() < 0.7:
+        if self.rng.random() < 0.7:
             return PlaceMarket(side, qty)
 
         # Aggressive limit near fair value
-        price = fv + random.randint(-4, 4)
+        price = fv + self.rng.randint(-4, 4)
         return PlaceLimit(side, price, qty)
-    
-    def on_trade(self, trade, side):
-        if side == "BUY":
-            self.inventory += trade.qty
-            self.balance -= trade.price * trade.qty
-        else:
-            self.inventory -= trade.qty
-            self.balance += trade.price * trade.qty
+
 
 class MomentumAgent(Agent):
-    # Trend following momentum trader using SMA crossover
+    # Trend following momentum trader using SMA crossover.
+    # By default the SMA is over the mids seen at the agent's own arrivals;
+    # pass a shared one (features.FeatureService.indicator) fed by the market.
+
+    market_fields = ("mid",)
 
     def __init__(
         self,
@@ -145,30 +188,44 @@ class MomentumAgent(Agent):
         window=50,
         arrival_rate=1.0,
         max_qty=5,
-        cash=10_000
+        cash=10_000,
+        sma=None,
+        feed=None
     ):
         super().__init__(agent_id, arrival_rate)
         self.window = window
-        self.prices = deque(maxlen=window)
+        self.shared_sma = sma is not None
+        self.sma = sma if sma is not None else SMA(window)
+        self.top = None
+        if feed is not None:
+            self.subscribe(feed)
         self.balance = cash
         self.inventory = 0
         self.max_qty = max_qty
 
+    def subscribe(self, feed):
+        # Keep a local top of book from a feed.MarketDataFeed instead of
+        # reading the market state on arrival
+        self.top = TopOfBook()
+        feed.subscribe(TOP, self.top.on_top)
+        self.market_fields = ()
+
     def get_action(self, market_state):
-        mid = market_state["mid"]
+        mid = market_state["mid"] if self.top is None else self.top.mid
 
         if mid is None:
             return None
 
-        self.prices.append(mid)
+        if not self.shared_sma:
+            self.sma.update(mid)
 
-        if len(self.prices) < self.window:
+        if not self.sma.ready:
             return None # Not enough history
 
-        sma = sum(self.prices) / self.window
+        sma = self.sma.value
 
         side = "BUY" if mid > sma else "SELL"
-        qty = random.randint(1, self.max_qty)
+        qty = self.rng.randint(1, self.max_qty)
 
         # Budget / inventory constraints
         if side == "BUY" and self.balance < mid * qty:
@@ -179,11 +236,3 @@ class MomentumAgent(Agent):
 
         # Momentum traders are aggressive
         return PlaceMarket(side, qty)
-    
-    def on_trade(self, trade, side):
-        if side == "BUY":
-            self.inventory += trade.qty
-            self.balance -= trade.price * trade.qty
-        else:
-            self.inventory -= trade.qty
-            self.balance += trade.price * trade.qty
\ No newline at end of file
@@ -0,0 +1,164 @@
+import math
+import random
+
+import numpy as np
+
+from bus import TRADE
+from events import GroupArrivalEvent
+
+
+class HawkesProcess:
+    """
+    Self-exciting arrivals with exponential kernel:
+        intensity(t) = baseline + sum_i alpha * exp(-beta * (t - t_i))
+    The sum is kept as one decayed excitation term, so arrivals and external
+    excitation (trades) are O(1) updates independent of history length.
+    Next arrival times are sampled by Ogata thinning.
+    """
+
+    def __init__(self, baseline, alpha, beta, trade_alpha=0.0):
+        if alpha / beta >= 1:
+            raise ValueError("Hawkes process is explosive: need alpha / beta < 1")
+        self.baseline = baseline
+        self.alpha = alpha
+        self.beta = beta
+        self.trade_alpha = trade_alpha
+        self.excitation = 0.0
+        self.last_time = 0.0
+        self.rng = random
+
+    def _decay_to(self, t):
+        if t > self.last_time:
+            self.excitation *= math.exp(-self.beta * (t - self.last_time))
+            self.last_time = t
+
+    def intensity(self, t):
+        self._decay_to(t)
+        return self.baseline + self.excitation
+
+    def excite(self, t, amount):
+        self._decay_to(t)
+        self.excitation += amount
+
+    def on_arrival(self, t):
+        self.excite(t, self.alpha)
+
+    def next_time(self, t):
+        # Intensity only decays until the next event, so the current value
+        # bounds it from above (Ogata thinning)
+        self._decay_to(t)
+        s = t
+        while True:
+            bound = self.baseline + self.excitation * math.exp(-self.beta * (s - t))
+            s += self.rng.expovariate(bound)
+            intensity = self.baseline + self.excitation * math.exp(-self.beta * (s - t))
+            if self.rng.random() * bound <= intensity:
+                return s
+
+
+class ArrivalGroup:
+    """
+    Drives the arrivals of an agent class from one shared process: each
+    arrival picks a member uniformly. With trade excitation, every trade
+    bumps the intensity and reschedules the single pending arrival (O(1)).
+    """
+
+    def __init__(self, agents, process):
+        self.agents = list(agents)
+        self.process = process
+        self.token = 0
+        self.rng = random
+
+    def pick(self):
+        return self.rng.choice(self.agents)
+
+    def start(self, engine, env, excite_on_trades=False):
+        for agent in self.agents:
+            engine.agents[agent.agent_id] = agent
+        self.engine = engine
+        self.env = env
+        if excite_on_trades:
+            engine.bus.subscribe(TRADE, self.on_trade)
+        self.schedule_next(engine, env)
+
+    def schedule_next(self, engine, env):
+        self.token += 1
+        clock = engine.clock
+        next_time = clock.ticks(self.process.next_time(clock.seconds(engine.time)))
+        engine.schedule(GroupArrivalEvent(next_time, self, env, self.token))
+
+    def on_arrival(self, engine, env):
+        self.process.on_arrival(engine.clock.seconds(engine.time))
+        self.schedule_next(engine, env)
+
+    def on_trade(self, time, trade):
+        self.process.excite(self.engine.clock.seconds(time), self.process.trade_alpha)
+        self.schedule_next(self.engine, self.env)
+
+
+class IntensityProfile:
+    """
+    Piecewise-constant intraday multiplier on an arrival rate, e.g. the
+    U-shaped volume curve from calibration.py. time_scale maps sim seconds
+    to profile seconds (1800 / 22500 squeezes a 375 minute session into a
+    30 minute run); the profile repeats after its last bucket.
+    """
+
+    def __init__(self, multipliers, bucket_seconds=60.0, time_scale=1.0):
+        self.multipliers = np.asarray(multipliers, dtype=float)
+        self.bucket_seconds = bucket_seconds
+        self.time_scale = time_scale
+        self.peak = float(self.multipliers.max())
+
+    @classmethod
+    def from_calibration(cls, calibration, time_scale=1.0):
+        profile = calibration["arrival_profile"]
+        return cls(profile["multipliers"], profile["bucket_seconds"], time_scale)
+
+    def __call__(self, t):
+        buckets = (np.asarray(t) * self.time_scale // self.bucket_seconds).astype(int)
+        return self.multipliers[buckets % len(self.multipliers)]
+
+
+class SeasonalArrivals:
+    """
+    Inhomogeneous Poisson arrivals with intensity rate * profile(t).
+    Candidates are drawn in blocks at the peak rate and thinned with one
+    vectorized accept test; next_time() just walks a cursor, so it plugs
+    into Agent.arrival_process (AgentArrivalEvent) or an ArrivalGroup.
+    """
+
+    def __init__(self, rate, profile, block_size=256, seed=None):
+        self.rate = rate
+        self.profile = profile
+        self.block_size = block_size
+        if seed is None:
+            seed = random.getrandbits(64)  # follows the global random seed
+        self.rng = np.random.default_rng(seed)
+        self.times = np.empty(0)
+        self.cursor = 0
+        self.frontier = 0.0
+
+    def _refill(self):
+        peak = self.rate * self.profile.peak
+        while True:
+            gaps = self.rng.exponential(1.0 / peak, self.block_size)
+            candidates = self.frontier + np.cumsum(gaps)
+            self.frontier = candidates[-1]
+            accept = self.rng.random(self.block_size) * peak < self.rate * self.profile(candidates)
+            if accept.any():
+                self.times = candidates[accept]
+                self.cursor = 0
+                return
+
+    def next_time(self, t):
+        while True:
+            if self.cursor == len(self.times):
+                self._refill()
+            s = self.times[self.cursor]
+            self.cursor += 1
+            if s > t:
+                return float(s)
+
+    def on_arrival(self, t):
+        pass
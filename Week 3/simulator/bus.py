@@ -0,0 +1,56 @@
+# Topics and their payloads (handler arguments)
+TRADE = "trade"              # (time, trade)
+BOOK_UPDATE = "book_update"  # (time, order_book)
+SNAPSHOT = "snapshot"        # (time, snapshot, depth)
+FILL = "fill"                # (time, agent, trade, side)
+
+
+class BatchedHandler:
+    # Buffers payloads and hands them over as one list of argument tuples
+    def __init__(self, handler, batch_size):
+        self.handler = handler
+        self.batch_size = batch_size
+        self.pending = []
+
+    def __call__(self, *payload):
+        self.pending.append(payload)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            batch, self.pending = self.pending, []
+            self.handler(batch)
+
+
+class EventBus:
+    def __init__(self):
+        # Only topics with subscribers have a key, so publishers can skip
+        # building a payload with a plain `topic in bus.handlers` check
+        self.handlers = {}
+        self.batched = []
+
+    def subscribe(self, topic, handler, batch_size=None):
+        if batch_size is not None:
+            handler = BatchedHandler(handler, batch_size)
+            self.batched.append(handler)
+        self.handlers.setdefault(topic, []).append(handler)
+        return handler
+
+    def unsubscribe(self, topic, handler):
+        handlers = self.handlers.get(topic, [])
+        if handler in handlers:
+            handlers.remove(handler)
+            if handler in self.batched:
+                handler.flush()
+                self.batched.remove(handler)
+        if not handlers:
+            self.handlers.pop(topic, None)
+
+    def publish(self, topic, *payload):
+        for handler in self.handlers.get(topic, ()):
+            handler(*payload)
+
+    def flush(self):
+        for handler in self.batched:
+            handler.flush()
@@ -0,0 +1,160 @@
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from replay import convert_bars
+
+NS_PER_SECOND = 1_000_000_000
+MINUTES_PER_DAY = 1440
+
+
+class Calibrator:
+    """
+    One pass, bounded memory statistics over a stream of OHLCV bar chunks
+    (BAR_DTYPE arrays, in time order): realized volatility, and intraday
+    volatility / volume profiles per minute of day. Memory is a few
+    1440-long accumulators regardless of the number of rows.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.returns = 0
+        self.sum_sq = 0.0
+        self.sq_by_minute = np.zeros(MINUTES_PER_DAY)
+        self.ret_by_minute = np.zeros(MINUTES_PER_DAY)
+        self.volume_by_minute = np.zeros(MINUTES_PER_DAY)
+        self.bars_by_minute = np.zeros(MINUTES_PER_DAY)
+        self.days = set()
+        self.bar_seconds = None
+        # Carried across chunk boundaries
+        self.prev_close = None
+        self.prev_day = None
+        self.prev_time = None
+        self.first_close = None
+
+    def update(self, bars):
+        if len(bars) == 0:
+            return
+        times = bars["time"]
+        if (np.diff(times) < 0).any() or (self.prev_time is not None and times[0] < self.prev_time):
+            raise ValueError("bars must be in ascending time order (sort them with replay.convert_bars)")
+        close = bars["close"].astype(float)
+        minutes = (times // (60 * NS_PER_SECOND)) % MINUTES_PER_DAY
+        days = times // (86400 * NS_PER_SECOND)
+
+        if self.bar_seconds is None and len(times) > 1:
+            gaps = np.diff(times)
+            gaps = gaps[gaps > 0]
+            if len(gaps):
+                self.bar_seconds = float(np.median(gaps)) / NS_PER_SECOND
+        if self.first_close is None:
+            self.first_close = float(close[0])
+
+        prev_close = np.concatenate([[np.nan if self.prev_close is None else self.prev_close], close[:-1]])
+        prev_day = np.concatenate([[-1 if self.prev_day is None else self.prev_day], days[:-1]])
+
+        # Intraday returns only: overnight gaps are not simulator moves
+        valid = (prev_day == days) & (prev_close > 0) & (close > 0)
+        r = np.log(close[valid] / prev_close[valid])
+        m = minutes[valid]
+
+        self.returns += len(r)
+        self.sum_sq += float(np.sum(r ** 2))
+        self.sq_by_minute += np.bincount(m, weights=r ** 2, minlength=MINUTES_PER_DAY)
+        self.ret_by_minute += np.bincount(m, minlength=MINUTES_PER_DAY)
+        self.volume_by_minute += np.bincount(minutes, weights=bars["volume"], minlength=MINUTES_PER_DAY)
+        self.bars_by_minute += np.bincount(minutes, minlength=MINUTES_PER_DAY)
+        self.days.update(np.unique(days).tolist())
+
+        self.rows += len(bars)
+        self.prev_close = float(close[-1])
+        self.prev_day = int(days[-1])
+        self.prev_time = int(times[-1])
+
+    def result(self, initial_value=100.0, dt=1.0, tick_size=1, snapshot_interval=1.0):
+        if self.returns == 0:
+            raise ValueError("no intraday returns to calibrate on (daily bars, or one bar per day)")
+        bar_seconds = self.bar_seconds or 60.0
+        var_per_bar = self.sum_sq / self.returns
+        sigma_per_second = np.sqrt(var_per_bar / bar_seconds)  # log-return vol
+
+        active = self.bars_by_minute > 0
+        first, last = np.flatnonzero(active)[[0, -1]] if active.any() else (0, MINUTES_PER_DAY - 1)
+        session = slice(first, last + 1)
+
+        vol_profile = _profile(
+            np.sqrt(self.sq_by_minute[session] / np.maximum(self.ret_by_minute[session], 1))
+        )
+        volume_profile = _profile(self.volume_by_minute[session] / np.maximum(self.bars_by_minute[session], 1))
+
+        return {
+            "market": {
+                "tick_size": tick_size,
+                "snapshot_interval": snapshot_interval,
+            },
+            "fair_value": {
+                "model": "random_walk",
+                "initial_value": initial_value,
+                # Arithmetic walk in simulator price units, per unit of sim time
+                # (fair value processes scale it by sqrt(dt) per step)
+                "sigma": float(initial_value * sigma_per_second),
+                "dt": dt,
+            },
+            # Arrival rate multipliers over the session (volume-weighted activity)
+            "arrival_profile": {
+                "bucket_seconds": 60.0,
+                "multipliers": volume_profile,
+            },
+            "calibration": {
+                "rows": self.rows,
+                "days": len(self.days),
+                "bar_seconds": bar_seconds,
+                "session_start_minute": int(first),
+                "sigma_per_second": float(sigma_per_second),
+                "daily_volatility": float(np.sqrt(var_per_bar * self.returns / max(len(self.days), 1))),
+                "volatility_profile": vol_profile,
+                "mean_volume_per_bar": float(self.volume_by_minute.sum() / max(self.rows, 1)),
+            },
+        }
+
+
+def _profile(values):
+    # Normalise to mean 1 over minutes that saw data
+    values = np.asarray(values, dtype=float)
+    mean = values[values > 0].mean() if (values > 0).any() else 1.0
+    return [round(float(v), 6) for v in values / mean]
+
+
+def iter_bar_chunks(path, chunksize=1_000_000):
+    # Time-sorted .npy files from replay.convert_bars, memory-mapped
+    bars = np.load(path, mmap_mode="r")
+    for start in range(0, len(bars), chunksize):
+        yield np.asarray(bars[start:start + chunksize])
+
+
+def calibrate(path, out_path=None, chunksize=1_000_000, **params):
+    calibrator = Calibrator()
+    if path.endswith(".npy"):
+        for bars in iter_bar_chunks(path, chunksize):
+            calibrator.update(bars)
+    else:
+        # CSVs may be newest first (AAPL.csv): sort out of core first
+        with tempfile.TemporaryDirectory() as tmp:
+            sorted_path = os.path.join(tmp, "bars.npy")
+            convert_bars(path, sorted_path, chunksize)
+            for bars in iter_bar_chunks(sorted_path, chunksize):
+                calibrator.update(bars)
+    result = calibrator.result(**params)
+    if out_path is not None:
+        with open(out_path, "w") as f:
+            json.dump(result, f, indent=2)
+    return result
+
+
+if __name__ == "__main__":
+    # python calibration.py "NIFTY 50_minute.csv" calibrated.json
+    result = calibrate(sys.argv[1], sys.argv[2])
+    print(json.dumps(result["fair_value"], indent=2))
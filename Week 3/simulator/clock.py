@@ -0,0 +1,20 @@
+NS_PER_SECOND = 1_000_000_000
+
+
+class FloatClock:
+    # Default: event times are float seconds
+    def ticks(self, seconds):
+        return seconds
+
+    def seconds(self, ticks):
+        return ticks
+
+
+class NanosecondClock:
+    # Event times are int nanoseconds: int-only heap comparisons, exact and
+    # platform independent tie-breaking, compact int64 log timestamps.
+    def ticks(self, seconds):
+        return int(round(seconds * NS_PER_SECOND))
+
+    def seconds(self, ticks):
+        return ticks / NS_PER_SECOND
@@ -1,14 +1,50 @@
+import copy
 import heapq
+import itertools
+import random
+from collections import ChainMap, deque
+from collections.abc import Sequence
+from bus import EventBus
+from clock import FloatClock
+from rng import RNGService
+from tracing import event_agent_id
 
 class MarketEngine:
-    def __init__(self, order_book, logger):
+    def __init__(self, order_book, logger, clock=None):
         self.order_book = order_book
         self.logger = logger
-        self.time = 0
+        # clock converts seconds to engine time units (float seconds or int ns)
+        self.clock = clock or FloatClock()
+        self.time = self.clock.ticks(0)
         self.event_queue = []
         self.seq = 0
         self.running = True
         self.agents = {}
+        # Array-backed agent populations by prefix (population.AgentPopulation);
+        # their members are not in agents, see agent()
+        self.populations = {}
+        # Fair value process following engine time (set by its attach())
+        self.fair_value = None
+        # FIFO lanes for events whose times are non-decreasing per lane
+        # (e.g. orders of a constant-latency class), merged with the heap on pop
+        self.lanes = {}
+        # Side effects (logging, analytics, features) subscribe here;
+        # pass logger=None to run without logging
+        self.bus = EventBus()
+        if logger is not None:
+            logger.attach(self)
+        self.tracer = None
+        # Optional ledger.Ledger keeping all agent accounts (see Ledger.attach)
+        self.ledger = None
+        # Pre-trade risk.RiskGate of the MarketEnvironment, if any
+        self.risk = None
+
+    def set_tracer(self, tracer):
+        # Traces every executed event and order book submit (None disables)
+        if tracer is not None:
+            tracer.clock = self.clock
+        self.tracer = tracer
+        self.order_book.tracer = tracer
 
     def schedule(self, event):
         heapq.heappush(
@@ -17,8 +53,190 @@ class MarketEngine:
         )
         self.seq += 1
 
-    def run(self):
-        while self.event_queue and self.running:
+    def schedule_fifo(self, lane, event):
+        queue = self.lanes.get(lane)
+        if queue is None:
+            queue = self.lanes[lane] = deque()
+        elif queue and event.time < queue[-1][0]:
+            raise ValueError("FIFO lane events must be scheduled in time order")
+        queue.append((event.time, self.seq, event))
+        self.seq += 1
+
+    def _next_source(self):
+        # k-way merge: the heap plus the head of each (few) FIFO lanes
+        best = self.event_queue if self.event_queue else None
+        for queue in self.lanes.values():
+            if queue and (best is None or queue[0] < best[0]):
+                best = queue
+        return best
+
+    def next_time(self):
+        source = self._next_source()
+        return None if source is None else source[0][0]
+
+    def step(self):
+        source = self._next_source()
+        if source is None:
+            return False
+        if source is self.event_queue:
             event_time, _, event = heapq.heappop(self.event_queue)
-            self.time = event_time
+        else:
+            event_time, _, event = source.popleft()
+        self.time = event_time
+        if self.tracer is None:
+            event.execute(self)
+        else:
+            start = self.tracer.now()
             event.execute(self)
+            self.tracer.record(
+                type(event).__name__, "event", start, self.tracer.now(),
+                event_time, event_agent_id(event)
+            )
+        return True
+
+    def run(self):
+        while self.running and self.step():
+            pass
+        self.bus.flush()
+
+    def run_until(self, target_time):
+        while True:
+            next_time = self.next_time()
+            if next_time is None or next_time > target_time:
+                break
+            self.step()
+        self.time = target_time
+        self.bus.flush()
+
+    def agent(self, agent_id):
+        # Registered agent, or the trading member of a population (None if neither)
+        agent = self.agents.get(agent_id)
+        if agent is None and self.populations:
+            for prefix, population in self.populations.items():
+                index = agent_id[len(prefix):]
+                if agent_id.startswith(prefix) and index.isdigit():
+                    return population.members.get(int(index))
+        return agent
+
+    def checkpoint(self, *attached):
+        # attached: objects living outside the engine (env wrapper, fair value, ...)
+        # that the caller wants back, consistent with the copied engine, on fork()
+        return Checkpoint(self, attached)
+
+    def fork(self):
+        engine, = self.checkpoint().fork()
+        return engine
+
+
+class Checkpoint:
+    """
+    Frozen copy of a running simulation: book, event queue, agents, fair value
+    and RNG states. Every fork() continues independently from this point.
+    Recorded history is frozen once here and shared by all forks, which only
+    keep what they record themselves (see History), so forking is O(live state).
+    """
+
+    def __init__(self, engine, attached=()):
+        self.state = _clone((engine, tuple(attached)))
+        self.time = engine.time
+        self.random_state = random.getstate()
+
+    def fork(self, seed=None):
+        # Without a seed every fork replays the same agent randomness
+        # (common random numbers); pass a seed to branch the paths.
+        engine, attached = _clone(self.state)
+        if seed is None:
+            random.setstate(self.random_state)
+        else:
+            random.seed(seed)
+            streams = RNGService(seed)
+            for agent in engine.agents.values():
+                if getattr(agent, "rng", random) is not random:
+                    agent.rng = streams.stream(agent.agent_id)
+            for population in engine.populations.values():
+                population.reseed(streams)
+            if engine.fair_value is not None and hasattr(engine.fair_value, "reseed"):
+                engine.fair_value.reseed(streams.seed("fair_value"))
+        return (engine, *attached)
+
+
+class History(Sequence):
+    """
+    Append-only record list of a forked simulation: the records made before
+    the checkpoint, shared as a tuple with the other forks, plus this fork's
+    own tail. Supports what the recording and reading code uses on lists
+    (append, len, indexing, slicing, iteration).
+    """
+
+    def __init__(self, prefix=()):
+        self.prefix = prefix
+        self.tail = []
+
+    def append(self, record):
+        self.tail.append(record)
+
+    def __len__(self):
+        return len(self.prefix) + len(self.tail)
+
+    def __iter__(self):
+        return itertools.chain(self.prefix, self.tail)
+
+    def __getitem__(self, index):
+        n = len(self.prefix)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1 and start >= n:
+                # Records made after the fork (e.g. this order's trades)
+                return self.tail[start - n:max(stop - n, 0)]
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+            if index < 0:
+                raise IndexError("History index out of range")
+        return self.prefix[index] if index < n else self.tail[index - n]
+
+    def frozen(self):
+        return self.prefix + tuple(self.tail) if self.tail else self.prefix
+
+
+def _history(engine):
+    # Append-only records that are never mutated after being stored
+    book, logger = engine.order_book, engine.logger
+    records = [book.trades, book.snapshots]
+    if logger is not None:
+        records += [logger.trades, logger.l1, logger.l2, logger.inventory]
+    if engine.ledger is not None:
+        records.append(engine.ledger.pnl)
+    return records
+
+
+def _frozen(records):
+    # Immutable contents of a history container, shared by the forks
+    if isinstance(records, History):
+        return records.frozen()
+    if isinstance(records, ChainMap):
+        return records.maps[1] if not records.maps[0] else dict(records)
+    return tuple(records) if isinstance(records, list) else dict(records)
+
+
+def _forked(frozen):
+    # Shared contents plus an empty container for the fork's own records
+    if isinstance(frozen, tuple):
+        return History(frozen)
+    return ChainMap({}, frozen)
+
+
+def _clone(state):
+    # Deep copy the live state (orders, heaps, agents, RNGs) but not the
+    # history containers: the clone gets the frozen records (O(1) when they
+    # already are) plus an empty tail of its own.
+    engine = state[0]
+    # The global random module (default agent rng) is shared, its state is
+    # restored by Checkpoint.fork()
+    memo = {id(random): random}
+    # Forks don't inherit the (file backed) tracer
+    if engine.tracer is not None:
+        memo[id(engine.tracer)] = None
+    for records in _history(engine):
+        memo[id(records)] = _forked(_frozen(records))
+    return copy.deepcopy(state, memo)
@@ -1,39 +1,90 @@
-import random
+from bus import BOOK_UPDATE
 from events import OrderSubmissionEvent
+from features import FeatureService
 from order import Order
-from actions import PlaceLimit, PlaceMarket, Cancel
+from actions import PlaceLimit, PlaceMarket, Cancel, Amend
+from quoting import round_to_tick
+
+class MarketState:
+    """
+    Market state handed to agents. Fields are computed from the book on
+    first access and cached until the book changes (see FeatureService),
+    so agents that never look at the book never build a snapshot.
+    Supports market_state.mid as well as market_state["mid"].
+    """
+
+    __slots__ = ("features",)
+
+    def __init__(self, features):
+        self.features = features
+
+    @property
+    def best_bid(self):
+        return self.features["best_bid"]
+
+    @property
+    def best_ask(self):
+        return self.features["best_ask"]
+
+    @property
+    def mid(self):
+        return self.features["mid"]
+
+    @property
+    def l2(self):
+        return self.features["snapshot"]
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
 
 class MarketEnvironment:
-    def __init__(self, engine, config):
+    def __init__(self, engine, config, risk=None):
         self.engine = engine
         self.config = config
+        # Optional pre-trade risk.RiskGate; the engine reports fills and
+        # dropped market order remainders to it
+        self.risk = risk
+        engine.risk = risk
+        self.features = FeatureService(engine)
+        self.market_state = MarketState(self.features.view)
 
     def get_market_state(self):
-        snapshot = self.engine.order_book.current_snapshot()
-        return {
-            "best_bid": snapshot.best_bid(),
-            "best_ask": snapshot.best_ask(),
-            "mid": (
-                (snapshot.best_bid() + snapshot.best_ask()) / 2
-                if snapshot.best_bid() is not None and snapshot.best_ask() is not None
-                else None
-            ),
-            "l2": snapshot
-        }
+        # Live view, read it during the current arrival only
+        return self.market_state
+
+    def market_state_for(self, agent):
+        # Agents declaring market_fields = () don't get (or pay for) a state
+        if agent.market_fields == ():
+            return None
+        return self.market_state
+
+    def _risk_accepts(self, agent, order):
+        price = order.price
+        if price is None:
+            # Market orders are valued at the touch they will hit (cached
+            # top of book, no snapshot)
+            price = self.features.get("best_ask" if order.side == "BUY" else "best_bid")
+        now = self.engine.clock.seconds(self.engine.time)
+        return self.risk.accept(agent, order, price, now)
+
+    def _order_id(self, agent):
+        # engine.seq makes ids unique when an agent places several orders at once
+        return f"{agent.agent_id}-{self.engine.time}-{self.engine.seq}"
 
     def apply_action(self, agent, action):
         if action is None:
             return
 
+        if isinstance(action, Amend):
+            self.apply_action(agent, Cancel(action.order_id))
+            action = action.limit
+
         if isinstance(action, PlaceLimit):
-            import math
-            if action.side == "BUY":
-                price = math.floor(action.price / self.config.tick_size) * self.config.tick_size
-            else:
-                price = math.ceil(action.price / self.config.tick_size) * self.config.tick_size
+            price = round_to_tick(action.side, action.price, self.config.tick_size)
 
             order = Order(
-                order_id=f"{agent.agent_id}-{self.engine.time}",
+                order_id=self._order_id(agent),
                 side=action.side,
                 price=price,
                 qty=max(self.config.lot_size, action.qty),
@@ -42,7 +93,7 @@ class MarketEnvironment:
 
         elif isinstance(action, PlaceMarket):
             order = Order(
-                order_id=f"{agent.agent_id}-{self.engine.time}",
+                order_id=self._order_id(agent),
                 side=action.side,
                 price=None,
                 qty=max(self.config.lot_size, action.qty),
@@ -52,15 +103,27 @@ class MarketEnvironment:
         elif isinstance(action, Cancel):
             self.engine.order_book.cancel(action.order_id)
             agent.active_orders.pop(action.order_id, None)
+            if self.risk is not None:
+                self.risk.on_close(action.order_id)
+            if BOOK_UPDATE in self.engine.bus.handlers:
+                self.engine.bus.publish(BOOK_UPDATE, self.engine.time, self.engine.order_book)
             return
 
         else:
             return
 
-        latency = random.expovariate(1.0 / self.config.mean_latency)
-        arrival_time = self.engine.time + latency
+        if self.risk is not None and not self._risk_accepts(agent, order):
+            return
+
+        latency_model = self.config.latency_model.model_for(agent)
+        arrival_time = self.engine.time + self.engine.clock.ticks(latency_model.sample(agent.rng))
+        event = OrderSubmissionEvent(arrival_time, order)
 
-        self.engine.schedule(OrderSubmissionEvent(arrival_time, order))
+        if latency_model.fifo:
+            self.engine.schedule_fifo(latency_model, event)
+        else:
+            self.engine.schedule(event)
 
         if isinstance(action, PlaceLimit):
+            action.order_id = order.order_id
             agent.active_orders[order.order_id] = order.qty
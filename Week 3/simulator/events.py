@@ -1,3 +1,6 @@
+from bus import TRADE, FILL, BOOK_UPDATE, SNAPSHOT
+
+
 class Event:
     def __init__(self, time):
         self.time = time
@@ -13,21 +16,72 @@ class AgentArrivalEvent(Event):
         self.env = env
 
     def execute(self, engine):
-        market_state = self.env.get_market_state()
+        market_state = self.env.market_state_for(self.agent)
         action = self.agent.get_action(market_state)
 
-        next_time = self.agent.next_event_time(self.time)
+        clock = engine.clock
+        next_time = clock.ticks(self.agent.next_event_time(clock.seconds(self.time)))
         engine.schedule(AgentArrivalEvent(next_time, self.agent, self.env))
 
-        # Synchronous cancel-replace:
-        # Old quotes are removed before new quotes are visible.
-        if action is None:
-            pass
-        elif isinstance(action, list):
-            for a in action:
-                self.env.apply_action(self.agent, a)
-        else:
-            self.env.apply_action(self.agent, action)
+        apply_actions(self.env, self.agent, action)
+
+
+def apply_actions(env, agent, action):
+    # Synchronous cancel-replace:
+    # Old quotes are removed before new quotes are visible.
+    if action is None:
+        pass
+    elif isinstance(action, list):
+        for a in action:
+            env.apply_action(agent, a)
+    else:
+        env.apply_action(agent, action)
+
+
+class GroupArrivalEvent(Event):
+    # One arrival of an agent class driven by a shared arrival process
+    # (see arrivals.ArrivalGroup); stale events from reschedules are skipped
+    def __init__(self, time, group, env, token):
+        super().__init__(time)
+        self.group = group
+        self.env = env
+        self.token = token
+
+    def execute(self, engine):
+        if self.token != self.group.token:
+            return
+
+        agent = self.group.pick()
+        market_state = self.env.market_state_for(agent)
+        action = agent.get_action(market_state)
+
+        self.group.on_arrival(engine, self.env)
+        apply_actions(self.env, agent, action)
+
+
+class PopulationArrivalEvent(Event):
+    # Batched arrivals of an AgentPopulation over the last `slice` seconds
+    def __init__(self, time, population, env):
+        super().__init__(time)
+        self.population = population
+        self.env = env
+
+    def execute(self, engine):
+        for agent, action in self.population.act():
+            self.env.apply_action(agent, action)
+
+        next_time = engine.time + engine.clock.ticks(self.population.slice)
+        engine.schedule(PopulationArrivalEvent(next_time, self.population, self.env))
+
+
+class PolicyBatchEvent(Event):
+    # End of a policy batching window (see policy.PolicyBatcher)
+    def __init__(self, time, batcher):
+        super().__init__(time)
+        self.batcher = batcher
+
+    def execute(self, engine):
+        self.batcher.flush()
 
 
 class MarketCloseEvent(Event):
@@ -44,15 +98,32 @@ class OrderSubmissionEvent(Event):
         self.order.timestamp = engine.time #  Execution time of order and not submission time 
         engine.order_book.submit(self.order)
 
+        bus = engine.bus
+        publish_trades = TRADE in bus.handlers
+        publish_fills = FILL in bus.handlers
+        ledger = engine.ledger
+        risk = engine.risk
+
         for t in engine.order_book.trades[prev_trades:]:
-            engine.logger.record_trade(t)
+            if publish_trades:
+                bus.publish(TRADE, engine.time, t)
 
             buy_id = t.buy_order_id.split("-")[0]
             sell_id = t.sell_order_id.split("-")[0]
 
-            if buy_id in engine.agents:
-                agent = engine.agents[buy_id]
+            if ledger is not None:
+                ledger.record_fill(buy_id, "BUY", t)
+                ledger.record_fill(sell_id, "SELL", t)
+
+            if risk is not None:
+                risk.on_fill(t.buy_order_id, t.qty)
+                risk.on_fill(t.sell_order_id, t.qty)
+
+            agent = engine.agent(buy_id)
+            if agent is not None:
                 agent.on_trade(t, "BUY")
+                if publish_fills:
+                    bus.publish(FILL, engine.time, agent, t, "BUY")
 
                 remaining = agent.active_orders.get(t.buy_order_id)
                 if remaining is not None:
@@ -62,9 +133,11 @@ class OrderSubmissionEvent(Event):
                     else:
                         agent.active_orders[t.buy_order_id] = remaining
 
-            if sell_id in engine.agents:
-                agent = engine.agents[sell_id]
+            agent = engine.agent(sell_id)
+            if agent is not None:
                 agent.on_trade(t, "SELL")
+                if publish_fills:
+                    bus.publish(FILL, engine.time, agent, t, "SELL")
                 
                 remaining = agent.active_orders.get(t.sell_order_id)
                 if remaining is not None:
@@ -74,6 +147,13 @@ class OrderSubmissionEvent(Event):
                     else:
                         agent.active_orders[t.sell_order_id] = remaining
 
+        # The unfilled rest of a market order does not rest in the book
+        if risk is not None and self.order.price is None:
+            risk.on_close(self.order.order_id)
+
+        if BOOK_UPDATE in bus.handlers:
+            bus.publish(BOOK_UPDATE, engine.time, engine.order_book)
+
 
 class SnapshotEvent(Event):
     def __init__(self, time, env, depth=5):
@@ -82,27 +162,14 @@ class SnapshotEvent(Event):
         self.depth = depth
 
     def execute(self, engine):
-        snapshot = engine.order_book.current_snapshot()
-
-        if snapshot.best_bid() is not None and snapshot.best_ask() is not None:
-            engine.logger.record_l1(
-                engine.time,
-                snapshot.best_bid(),
-                snapshot.best_ask()
-            )
-            engine.logger.record_l2(
-                engine.time,
-                snapshot.bids[:self.depth],
-                snapshot.asks[:self.depth]
-            )
-
-        for agent in engine.agents.values():
-            if hasattr(agent, "inventory"):
-                engine.logger.record_inventory(engine.time, agent.agent_id, agent.inventory)
+        # Snapshot is only built when someone listens
+        if SNAPSHOT in engine.bus.handlers:
+            snapshot = engine.order_book.current_snapshot()
+            engine.bus.publish(SNAPSHOT, engine.time, snapshot, self.depth)
 
         if engine.running:
             engine.schedule(
-                SnapshotEvent(engine.time + self.env.config.snapshot_interval,
+                SnapshotEvent(engine.time + engine.clock.ticks(self.env.config.snapshot_interval),
                             self.env,
                             self.depth)
             )
@@ -116,5 +183,5 @@ class FairValueUpdateEvent(Event):
     def execute(self, engine):
         self.fv.step()
         engine.schedule(
-            FairValueUpdateEvent(engine.time + self.dt, self.fv, self.dt)
+            FairValueUpdateEvent(engine.time + engine.clock.ticks(self.dt), self.fv, self.dt)
         )
@@ -1,14 +1,297 @@
+import math
+from bisect import bisect_left
+
 import numpy as np
 
 class FairValueProcess:
+    # Arithmetic random walk stepped once per unit of sim time: each step
+    # adds sigma * N(0, 1)
     def __init__(self, initial_value=100.0, sigma=0.5, seed=None):
         self.value = initial_value
         self.sigma = sigma
         self.rng = np.random.default_rng(seed)
 
+    def reseed(self, seed):
+        # New random path from the current value on (Checkpoint.fork)
+        self.rng = np.random.default_rng(seed)
+
     def step(self):
         self.value += self.sigma * self.rng.normal()
         return self.value
 
     def get(self):
         return self.value
+
+
+class LazyFairValueProcess(FairValueProcess):
+    """
+    Fair value evaluated at query time instead of stepped by FairValueUpdateEvent.
+
+    get() advances the walk only up to the engine's current time, drawing the
+    same normals in the same order as stepping every dt from t=0, so for a given
+    seed the path equals the event-driven one. With bridge=True the value moves
+    continuously: between grid points it is sampled from a Brownian bridge on a
+    separate stream and cached, so queries at any times stay consistent.
+    Queries are expected in non-decreasing time, as the engine produces them.
+    sigma is per unit of sim time as in RandomWalkProcess: a dt step adds
+    sigma * sqrt(dt) * N(0, 1), so the same sigma gives the same volatility
+    whichever of the two processes a scenario picks.
+    """
+
+    def __init__(self, initial_value=100.0, sigma=0.5, dt=1.0, seed=None, bridge=False):
+        super().__init__(initial_value, sigma, seed)
+        self.dt = dt
+        self.bridge = bridge
+        self.bridge_rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0])
+        self.steps = 0
+        self.prev_value = initial_value
+        self.points = None
+        self.engine = None
+
+    def attach(self, engine):
+        self.engine = engine
+        engine.fair_value = self
+
+    def reseed(self, seed):
+        super().reseed(seed)
+        self.bridge_rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0])
+
+    def step(self):
+        self.prev_value = self.value
+        self.steps += 1
+        self.points = None
+        self.value += self.sigma * math.sqrt(self.dt) * self.rng.normal()
+        return self.value
+
+    def get(self, t=None):
+        if t is None:
+            if self.engine is None:
+                return self.value
+            t = self.engine.clock.seconds(self.engine.time)
+
+        target = int(t // self.dt) + 1
+        while self.steps < target:
+            self.step()
+
+        if not self.bridge:
+            return self.value
+        return self._bridge(t)
+
+    def _bridge(self, t):
+        # Known points of the current grid interval, sorted by time
+        if self.points is None:
+            t1 = self.steps * self.dt
+            self.points = [(t1 - self.dt, self.prev_value), (t1, self.value)]
+        points = self.points
+
+        i = bisect_left(points, (t,))
+        if i < len(points) and points[i][0] == t:
+            return points[i][1]
+        if i == 0 or i == len(points):
+            return self.value  # outside the current interval (query went backwards)
+
+        (ta, va), (tb, vb) = points[i - 1], points[i]
+        mean = va + (t - ta) / (tb - ta) * (vb - va)
+        std = self.sigma * math.sqrt((t - ta) * (tb - t) / (tb - ta))
+        value = mean + std * self.bridge_rng.normal()
+        points.insert(i, (t, value))
+        return value
+
+
+class BlockFairValueProcess(FairValueProcess):
+    """
+    Base for fair value models that pre-draw their path in NumPy blocks of
+    block_size steps and serve it through a cursor, instead of one RNG call
+    per step. Same step()/get() contract as FairValueProcess; after attach()
+    get() also follows engine time like LazyFairValueProcess (without bridge).
+    Model parameters are per unit of sim time, dt is the step length.
+    """
+
+    def __init__(self, initial_value=100.0, dt=1.0, seed=None, block_size=4096):
+        self.value = initial_value
+        self.dt = dt
+        self.rng = np.random.default_rng(seed)
+        self.block_size = block_size
+        self.block = np.empty(0)
+        self.cursor = 0
+        self.steps = 0
+        self.engine = None
+
+    def _draw_block(self, n):
+        # Next n values of the path, continuing from self.value
+        raise NotImplementedError
+
+    def _value_at(self, i):
+        # Process value held in row i of the block
+        return float(self.block[i])
+
+    def attach(self, engine):
+        self.engine = engine
+        engine.fair_value = self
+
+    def reseed(self, seed):
+        # Drops the pre-drawn rest of the block, redrawn from the new stream
+        super().reseed(seed)
+        self.block = self.block[:self.cursor]
+
+    def advance(self, n):
+        while n > 0:
+            if self.cursor == len(self.block):
+                self.block = self._draw_block(self.block_size)
+                self.cursor = 0
+            take = min(n, len(self.block) - self.cursor)
+            self.cursor += take
+            self.steps += take
+            n -= take
+            self.value = self._value_at(self.cursor - 1)
+        return self.value
+
+    def step(self):
+        return self.advance(1)
+
+    def get(self, t=None):
+        if t is None:
+            if self.engine is None:
+                return self.value
+            t = self.engine.clock.seconds(self.engine.time)
+
+        target = int(t // self.dt) + 1
+        if target > self.steps:
+            self.advance(target - self.steps)
+        return self.value
+
+
+class RandomWalkProcess(BlockFairValueProcess):
+    # Arithmetic random walk, same dynamics as LazyFairValueProcess: sigma is
+    # per unit of sim time, a dt step adds sigma * sqrt(dt) * N(0, 1)
+    def __init__(self, initial_value=100.0, sigma=0.5, dt=1.0, seed=None, block_size=4096):
+        super().__init__(initial_value, dt, seed, block_size)
+        self.sigma = sigma
+
+    def _draw_block(self, n):
+        z = self.rng.standard_normal(n)
+        return self.value + self.sigma * np.sqrt(self.dt) * np.cumsum(z)
+
+
+class GBMProcess(BlockFairValueProcess):
+    # Geometric Brownian motion, as in Week 0 03_GBM
+    def __init__(self, initial_value=100.0, mu=0.0, sigma=0.005, dt=1.0, seed=None, block_size=4096):
+        super().__init__(initial_value, dt, seed, block_size)
+        self.mu = mu
+        self.sigma = sigma
+
+    def _draw_block(self, n):
+        z = self.rng.standard_normal(n)
+        increments = (self.mu - 0.5 * self.sigma ** 2) * self.dt + self.sigma * np.sqrt(self.dt) * z
+        return self.value * np.exp(np.cumsum(increments))
+
+
+class OUProcess(BlockFairValueProcess):
+    # Ornstein-Uhlenbeck mean reversion to `mean` at speed theta (exact discretisation)
+    def __init__(self, initial_value=100.0, mean=100.0, theta=0.1, sigma=0.5, dt=1.0, seed=None, block_size=4096):
+        if theta <= 0:
+            raise ValueError("OUProcess needs theta > 0")
+        if sigma < 0:
+            raise ValueError("OUProcess needs sigma >= 0")
+        if dt <= 0:
+            raise ValueError("OUProcess needs dt > 0")
+        super().__init__(initial_value, dt, seed, block_size)
+        self.mean = mean
+        self.theta = theta
+        self.sigma = sigma
+
+    def _draw_block(self, n):
+        a = np.exp(-self.theta * self.dt)
+        s = self.sigma * np.sqrt((1 - a ** 2) / (2 * self.theta))
+        z = self.rng.standard_normal(n)
+
+        # y_k = a^k * (y_0 + s * sum_j a^-j z_j), in chunks short enough
+        # that a^-k does not overflow
+        chunk = max(1, int(50 / (self.theta * self.dt)))
+        out = np.empty(n)
+        y = self.value - self.mean
+        for start in range(0, n, chunk):
+            zc = z[start:start + chunk]
+            powers = a ** np.arange(1, len(zc) + 1)
+            ys = powers * (y + s * np.cumsum(zc / powers))
+            out[start:start + len(zc)] = ys
+            y = ys[-1]
+        return self.mean + out
+
+
+class MertonJumpProcess(BlockFairValueProcess):
+    # GBM plus compound Poisson jumps with normal log jump sizes
+    def __init__(
+        self,
+        initial_value=100.0,
+        mu=0.0,
+        sigma=0.005,
+        jump_rate=0.01,
+        jump_mean=0.0,
+        jump_std=0.02,
+        dt=1.0,
+        seed=None,
+        block_size=4096
+    ):
+        super().__init__(initial_value, dt, seed, block_size)
+        self.mu = mu
+        self.sigma = sigma
+        self.jump_rate = jump_rate
+        self.jump_mean = jump_mean
+        self.jump_std = jump_std
+
+    def _draw_block(self, n):
+        z = self.rng.standard_normal(n)
+        counts = self.rng.poisson(self.jump_rate * self.dt, n)
+        jumps = counts * self.jump_mean + np.sqrt(counts) * self.jump_std * self.rng.standard_normal(n)
+
+        # Compensated drift keeps E[S_t] = S_0 * exp(mu * t)
+        kappa = np.exp(self.jump_mean + 0.5 * self.jump_std ** 2) - 1
+        drift = (self.mu - 0.5 * self.sigma ** 2 - self.jump_rate * kappa) * self.dt
+        increments = drift + self.sigma * np.sqrt(self.dt) * z + jumps
+        return self.value * np.exp(np.cumsum(increments))
+
+
+class MultiFairValueProcess(BlockFairValueProcess):
+    """
+    N correlated arithmetic random walks (index + constituents, pairs).
+    cov is the per unit time covariance of the increments; blocks of
+    correlated increments are one (block_size x N) @ Cholesky product.
+    get()/step() return the vector of all assets; asset(i) gives a
+    FairValueProcess-like view for existing agents.
+    """
+
+    def __init__(self, initial_values, cov, dt=1.0, seed=None, block_size=1024):
+        super().__init__(np.array(initial_values, dtype=float), dt, seed, block_size)
+        self.cov = np.asarray(cov, dtype=float)
+        self.chol = np.linalg.cholesky(self.cov)
+        self.n_assets = len(self.value)
+
+    def _draw_block(self, n):
+        z = self.rng.standard_normal((n, self.n_assets))
+        increments = np.sqrt(self.dt) * (z @ self.chol.T)
+        return self.value + np.cumsum(increments, axis=0)
+
+    def _value_at(self, i):
+        # One row holds the whole vector of assets
+        return self.block[i]
+
+    def asset(self, index):
+        return FairValueView(self, index)
+
+    def assets(self):
+        return [FairValueView(self, i) for i in range(self.n_assets)]
+
+
+class FairValueView:
+    # Single asset of a MultiFairValueProcess; step the parent, not the view
+    def __init__(self, process, index):
+        self.process = process
+        self.index = index
+
+    @property
+    def value(self):
+        return float(self.process.value[self.index])
+
+    def get(self):
+        return float(self.process.get()[self.index])
@@ -0,0 +1,155 @@
+from collections.abc import Mapping
+
+
+def _snapshot(f):
+    return f.service.book.current_snapshot()
+
+
+def _best_bid(f):
+    return f.service.book.best_bid()
+
+
+def _best_ask(f):
+    return f.service.book.best_ask()
+
+
+def _mid(f):
+    bid, ask = f["best_bid"], f["best_ask"]
+    if bid is None or ask is None:
+        return None
+    return (bid + ask) / 2
+
+
+def _spread(f):
+    bid, ask = f["best_bid"], f["best_ask"]
+    if bid is None or ask is None:
+        return None
+    return ask - bid
+
+
+def _top_qty(f):
+    snapshot = f["snapshot"]
+    if not snapshot.bids or not snapshot.asks:
+        return None
+    return snapshot.bids[0][1], snapshot.asks[0][1]
+
+
+def _imbalance(f):
+    top = _top_qty(f)
+    if top is None:
+        return None
+    bid_qty, ask_qty = top
+    return (bid_qty - ask_qty) / (bid_qty + ask_qty)
+
+
+def _microprice(f):
+    top = _top_qty(f)
+    if top is None:
+        return None
+    bid_qty, ask_qty = top
+    return (f["best_bid"] * ask_qty + f["best_ask"] * bid_qty) / (bid_qty + ask_qty)
+
+
+BOOK_FEATURES = {
+    "snapshot": _snapshot,
+    "best_bid": _best_bid,
+    "best_ask": _best_ask,
+    "mid": _mid,
+    "spread": _spread,
+    "imbalance": _imbalance,
+    "microprice": _microprice,
+}
+
+
+class FeatureView(Mapping):
+    # Read-only access to the features of a FeatureService
+    __slots__ = ("service",)
+
+    def __init__(self, service):
+        self.service = service
+
+    def __getitem__(self, name):
+        return self.service.get(name)
+
+    def __iter__(self):
+        return iter(self.service.features)
+
+    def __len__(self):
+        return len(self.service.features)
+
+
+class FeatureIndicator:
+    # Rolling indicator over one feature (or a tuple of features for
+    # two-input indicators such as RollingCorrelation), updated at most once
+    # per book version
+    def __init__(self, service, indicator, source):
+        self.service = service
+        self.indicator = indicator
+        self.sources = (source,) if isinstance(source, str) else tuple(source)
+        self.version = None
+
+    def _sync(self):
+        version = self.service.book.version
+        if version != self.version:
+            self.version = version
+            values = [self.service.get(name) for name in self.sources]
+            if None not in values:
+                self.indicator.update(*values)
+
+    @property
+    def value(self):
+        self._sync()
+        return self.indicator.value
+
+    @property
+    def ready(self):
+        self._sync()
+        return self.indicator.ready
+
+
+class FeatureService:
+    """
+    Market features shared by all agents. A feature is computed lazily on
+    first access and cached until the book version changes (or, for
+    time_dependent features, the engine time), so each one is computed at
+    most once per book change however many agents read it.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.features = {}
+        self.cache = {}
+        self.indicators = {}
+        self.view = FeatureView(self)
+        for name, fn in BOOK_FEATURES.items():
+            self.register(name, fn)
+
+    @property
+    def book(self):
+        return self.engine.order_book
+
+    def register(self, name, fn, time_dependent=False):
+        # fn(view) -> value; it may read other features through the view
+        self.features[name] = (fn, time_dependent)
+        self.cache.pop(name, None)
+
+    def get(self, name):
+        fn, time_dependent = self.features[name]
+        key = (self.book.version, self.engine.time) if time_dependent else self.book.version
+        cached = self.cache.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = fn(self.view)
+        self.cache[name] = (key, value)
+        return value
+
+    def indicator(self, cls, *params, source="mid"):
+        # Shared indicators.* instance over a feature, e.g. indicator(SMA, 20)
+        # or indicator(RollingCorrelation, 50, source=("mid", "microprice"))
+        if not isinstance(source, str):
+            source = tuple(source)
+        key = (cls, params, source)
+        indicator = self.indicators.get(key)
+        if indicator is None:
+            indicator = self.indicators[key] = FeatureIndicator(self, cls(*params), source)
+        return indicator
@@ -0,0 +1,201 @@
+from bisect import bisect_left, insort
+
+# Subscription kinds
+TOP = "top"  # handler(time, bid, bid_qty, ask, ask_qty) on top-of-book changes
+DEPTH = "depth"  # handler(time, side, price, qty) for the best `depth` levels; qty 0 removes
+TRADES = "trades"  # handler(time, trade)
+
+
+class MarketDataFeed:
+    """
+    Incremental market data pushed by the order book: aggregated level
+    changes, trades and top-of-book changes. Subscribers get the current
+    image on subscribe and then only updates, so local views (TopOfBook,
+    LocalBook) stay current in O(1) per message instead of rebuilding a
+    snapshot on every arrival. Level updates are filtered per subscriber
+    depth: a depth-k subscriber only hears about its best k levels.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.book = engine.order_book
+        self.levels = {"BUY": {}, "SELL": {}}
+        self.prices = {"BUY": [], "SELL": []}  # ascending
+        self.top_handlers = []
+        self.depth_handlers = []  # (depth, handler)
+        self.trade_handlers = []
+        for side, heap in (("BUY", self.book.bids), ("SELL", self.book.asks)):
+            levels = self.levels[side]
+            for _, _, order in heap:
+                levels[order.price] = levels.get(order.price, 0) + order.qty
+            self.prices[side] = sorted(levels)
+        self.top = self._top()
+        self.book.feed = self
+
+    def subscribe(self, kind, handler, depth=5):
+        time = self.engine.time
+        if kind == TOP:
+            self.top_handlers.append(handler)
+            handler(time, *self.top)
+        elif kind == DEPTH:
+            self.depth_handlers.append((depth, handler))
+            for side in ("BUY", "SELL"):
+                for rank in range(min(depth, len(self.prices[side]))):
+                    price = self._at_rank(side, rank)
+                    handler(time, side, price, self.levels[side][price])
+        elif kind == TRADES:
+            self.trade_handlers.append(handler)
+        else:
+            raise ValueError(f"Unknown feed subscription: {kind}")
+
+    def _top(self):
+        bids, asks = self.prices["BUY"], self.prices["SELL"]
+        bid = bids[-1] if bids else None
+        ask = asks[0] if asks else None
+        return (
+            bid, self.levels["BUY"][bid] if bid is not None else 0,
+            ask, self.levels["SELL"][ask] if ask is not None else 0,
+        )
+
+    def _rank(self, side, index):
+        # 0 is the best level of the side
+        return len(self.prices[side]) - 1 - index if side == "BUY" else index
+
+    def _at_rank(self, side, rank):
+        prices = self.prices[side]
+        return prices[len(prices) - 1 - rank] if side == "BUY" else prices[rank]
+
+    def _send_level(self, side, rank, price, qty):
+        time = self.engine.time
+        for depth, handler in self.depth_handlers:
+            if rank < depth:
+                handler(time, side, price, qty)
+
+    # Called by OrderBook
+
+    def level_delta(self, side, price, delta):
+        levels = self.levels[side]
+        prices = self.prices[side]
+        old = levels.get(price, 0)
+        qty = old + delta
+
+        if not self.depth_handlers:
+            if qty <= 0:
+                del levels[price]
+                del prices[bisect_left(prices, price)]
+            else:
+                if not old:
+                    insort(prices, price)
+                levels[price] = qty
+            return
+
+        if qty <= 0:
+            index = bisect_left(prices, price)
+            rank = self._rank(side, index)
+            del levels[price]
+            del prices[index]
+            self._send_level(side, rank, price, 0)
+            self._refill(side, rank)
+        elif not old:
+            levels[price] = qty
+            insort(prices, price)
+            rank = self._rank(side, bisect_left(prices, price))
+            self._send_level(side, rank, price, qty)
+            self._evict(side, rank)
+        else:
+            levels[price] = qty
+            rank = self._rank(side, bisect_left(prices, price))
+            self._send_level(side, rank, price, qty)
+
+    def _refill(self, side, rank):
+        # A level at `rank` left: for depth-k subscribers with rank < k the
+        # level now at rank k - 1 enters their window
+        time = self.engine.time
+        count = len(self.prices[side])
+        for depth, handler in self.depth_handlers:
+            if rank < depth <= count:
+                price = self._at_rank(side, depth - 1)
+                handler(time, side, price, self.levels[side][price])
+
+    def _evict(self, side, rank):
+        # A level entered at `rank`: the one pushed to rank k leaves the window
+        time = self.engine.time
+        count = len(self.prices[side])
+        for depth, handler in self.depth_handlers:
+            if rank < depth < count:
+                handler(time, side, self._at_rank(side, depth), 0)
+
+    def trade(self, trade):
+        time = self.engine.time
+        for handler in self.trade_handlers:
+            handler(time, trade)
+
+    def book_changed(self):
+        top = self._top()
+        if top != self.top:
+            self.top = top
+            time = self.engine.time
+            for handler in self.top_handlers:
+                handler(time, *top)
+
+
+class TopOfBook:
+    # Local best bid / ask, kept by a TOP subscription
+    __slots__ = ("bid", "bid_qty", "ask", "ask_qty")
+
+    def __init__(self):
+        self.bid = self.ask = None
+        self.bid_qty = self.ask_qty = 0
+
+    def on_top(self, time, bid, bid_qty, ask, ask_qty):
+        self.bid, self.bid_qty, self.ask, self.ask_qty = bid, bid_qty, ask, ask_qty
+
+    @property
+    def mid(self):
+        if self.bid is None or self.ask is None:
+            return None
+        return (self.bid + self.ask) / 2
+
+
+class LocalBook:
+    """
+    Local aggregated book of the best `depth` levels, kept by a DEPTH
+    subscription (O(1) per update). Reads sort lazily and share the
+    BookSnapshot interface: bids / asks as (price, qty), best_bid(), best_ask().
+    """
+
+    def __init__(self, depth=5):
+        self.depth = depth
+        self.levels = {"BUY": {}, "SELL": {}}
+        self._sorted = {}
+
+    def on_level(self, time, side, price, qty):
+        if qty:
+            self.levels[side][price] = qty
+        else:
+            self.levels[side].pop(price, None)
+        self._sorted.pop(side, None)
+
+    def _side(self, side):
+        levels = self._sorted.get(side)
+        if levels is None:
+            book = self.levels[side]
+            prices = sorted(book, reverse=side == "BUY")[:self.depth]
+            levels = self._sorted[side] = [(p, book[p]) for p in prices]
+        return levels
+
+    @property
+    def bids(self):
+        return self._side("BUY")
+
+    @property
+    def asks(self):
+        return self._side("SELL")
+
+    def best_bid(self):
+        bids = self.bids
+        return bids[0][0] if bids else None
+
+    def best_ask(self):
+        asks = self.asks
+        return asks[0][0] if asks else None
@@ -0,0 +1,175 @@
+from collections import deque
+
+# O(1)-update rolling statistics for signal-based agents. Every indicator
+# takes one observation per update() call and exposes `value` (None until
+# it has data) and `ready` (a full window has been seen). To share one
+# instance between agents use features.FeatureService.indicator().
+
+
+class SMA:
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.value = None
+
+    @property
+    def ready(self):
+        return len(self.values) == self.window
+
+    def update(self, x):
+        self.values.append(x)
+        self.total += x
+        if len(self.values) > self.window:
+            self.total -= self.values.popleft()
+        self.value = self.total / len(self.values)
+        return self.value
+
+
+class EMA:
+    def __init__(self, span=None, alpha=None):
+        if alpha is None:
+            if span is None:
+                raise ValueError("EMA needs a span or an alpha")
+            alpha = 2 / (span + 1)
+        self.alpha = alpha
+        self.count = 0
+        self.value = None
+
+    @property
+    def ready(self):
+        return self.count > 0
+
+    def update(self, x):
+        self.count += 1
+        if self.value is None:
+            self.value = x
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class RollingVariance:
+    # Welford's algorithm with removal of the observation leaving the window
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.value = None
+
+    @property
+    def ready(self):
+        return len(self.values) == self.window
+
+    @property
+    def std(self):
+        return None if self.value is None else max(self.value, 0.0) ** 0.5
+
+    def update(self, x):
+        self.values.append(x)
+        n = len(self.values)
+        if n > self.window:
+            old = self.values.popleft()
+            n -= 1
+            old_mean = self.mean
+            self.mean += (x - old) / n
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        else:
+            delta = x - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (x - self.mean)
+        self.value = self.m2 / (n - 1) if n > 1 else None
+        return self.value
+
+
+class ZScore:
+    # (x - rolling mean) / rolling std of the last `window` observations
+    def __init__(self, window):
+        self.variance = RollingVariance(window)
+        self.value = None
+
+    @property
+    def ready(self):
+        return self.variance.ready
+
+    def update(self, x):
+        self.variance.update(x)
+        std = self.variance.std
+        self.value = (x - self.variance.mean) / std if std else 0.0
+        return self.value
+
+
+class _RollingExtreme:
+    # Monotonic deque of (index, value); the front is the window extreme
+    def __init__(self, window):
+        self.window = window
+        self.count = 0
+        self.queue = deque()
+        self.value = None
+
+    @property
+    def ready(self):
+        return self.count >= self.window
+
+    def update(self, x):
+        queue = self.queue
+        while queue and self._dominates(x, queue[-1][1]):
+            queue.pop()
+        queue.append((self.count, x))
+        self.count += 1
+        if queue[0][0] <= self.count - 1 - self.window:
+            queue.popleft()
+        self.value = queue[0][1]
+        return self.value
+
+
+class RollingMax(_RollingExtreme):
+    @staticmethod
+    def _dominates(x, y):
+        return x >= y
+
+
+class RollingMin(_RollingExtreme):
+    @staticmethod
+    def _dominates(x, y):
+        return x <= y
+
+
+class RollingCorrelation:
+    # Pearson correlation of two series; update() takes one (x, y) pair
+    def __init__(self, window):
+        self.window = window
+        self.pairs = deque()
+        self.mean_x = self.mean_y = 0.0
+        self.m2_x = self.m2_y = self.c_xy = 0.0
+        self.value = None
+
+    @property
+    def ready(self):
+        return len(self.pairs) == self.window
+
+    def update(self, x, y):
+        self.pairs.append((x, y))
+        n = len(self.pairs)
+        if n > self.window:
+            old_x, old_y = self.pairs.popleft()
+            n -= 1
+            mx, my = self.mean_x, self.mean_y
+            self.mean_x += (x - old_x) / n
+            self.mean_y += (y - old_y) / n
+            self.m2_x += (x - old_x) * (x - self.mean_x + old_x - mx)
+            self.m2_y += (y - old_y) * (y - self.mean_y + old_y - my)
+            # sum((x - mx)(y - my)) = sum(xy) - n*mx*my
+            self.c_xy += x * y - old_x * old_y - n * (self.mean_x * self.mean_y - mx * my)
+        else:
+            dx, dy = x - self.mean_x, y - self.mean_y
+            self.mean_x += dx / n
+            self.mean_y += dy / n
+            self.m2_x += dx * (x - self.mean_x)
+            self.m2_y += dy * (y - self.mean_y)
+            self.c_xy += dx * (y - self.mean_y)
+        denom = self.m2_x * self.m2_y
+        self.value = self.c_xy / denom ** 0.5 if denom > 0 else None
+        return self.value
+
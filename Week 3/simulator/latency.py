@@ -0,0 +1,54 @@
+import random
+
+
+class LatencyModel:
+    # fifo: every order sees the same delay, so a class's arrivals are already
+    # time-sorted and can go to an engine FIFO lane instead of the global heap
+    fifo = False
+
+    def sample(self, rng=random):
+        raise NotImplementedError
+
+    def model_for(self, agent):
+        return self
+
+
+class ExponentialLatency(LatencyModel):
+    def __init__(self, mean=1.0):
+        self.mean = mean
+
+    def sample(self, rng=random):
+        return rng.expovariate(1.0 / self.mean)
+
+
+class ConstantLatency(LatencyModel):
+    fifo = True
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def sample(self, rng=random):
+        return self.delay
+
+
+class EmpiricalLatency(LatencyModel):
+    # Resamples observed latencies (e.g. measured retail round trips)
+    def __init__(self, samples):
+        self.samples = list(samples)
+
+    def sample(self, rng=random):
+        return rng.choice(self.samples)
+
+
+class AgentClassLatency(LatencyModel):
+    # Per agent class latency, e.g. colocated market makers vs retail noise traders:
+    # AgentClassLatency({"MarketMakerAgent": ConstantLatency(0.01)}, default=ExponentialLatency(1.0))
+    def __init__(self, models, default=None):
+        self.models = dict(models)
+        self.default = default if default is not None else ExponentialLatency()
+
+    def sample(self, rng=random):
+        return self.default.sample(rng)
+
+    def model_for(self, agent):
+        return self.models.get(type(agent).__name__, self.default)
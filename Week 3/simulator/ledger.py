@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from bus import SNAPSHOT
+
+
+class Ledger:
+    """
+    Cash and inventory of all agents in NumPy arrays indexed by agent row.
+    Fills recorded by the matching path are buffered per row and written to
+    the arrays in one vectorized batch when all accounts are next read;
+    single-account reads see the buffered fills without flushing. Every
+    snapshot marks all accounts to the mid in one expression. Registered
+    agents expose their balance / inventory as read-only views onto their row.
+    """
+
+    def __init__(self, capacity=256):
+        self.rows = {}  # agent_id -> row
+        self.agent_ids = []
+        self.cash = np.zeros(capacity)
+        self.position = np.zeros(capacity, dtype=np.int64)
+        self.initial_cash = np.zeros(capacity)
+        self.initial_position = np.zeros(capacity, dtype=np.int64)
+        self.pending = {}  # row -> [position, cash] including unflushed fills
+        self.pnl = []  # (time, mark-to-market PnL per row)
+
+    def __len__(self):
+        return len(self.agent_ids)
+
+    def _grow(self):
+        size = 2 * len(self.cash)
+        for name in ("cash", "position", "initial_cash", "initial_position"):
+            old = getattr(self, name)
+            new = np.zeros(size, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def register(self, agent):
+        # Takes over the agent's current balance and inventory
+        row = len(self.agent_ids)
+        if row == len(self.cash):
+            self._grow()
+        self.cash[row] = self.initial_cash[row] = agent.balance
+        self.position[row] = self.initial_position[row] = agent.inventory
+        self.rows[agent.agent_id] = row
+        self.agent_ids.append(agent.agent_id)
+        agent.ledger, agent.ledger_row = self, row
+        return row
+
+    def attach(self, engine):
+        # Registers the engine's agents (those keeping local accounts)
+        for agent in engine.agents.values():
+            if getattr(agent, "ledger", False) is None:
+                self.register(agent)
+        engine.ledger = self
+        engine.bus.subscribe(SNAPSHOT, self.on_snapshot)
+
+    def record_fill(self, agent_id, side, trade):
+        row = self.rows.get(agent_id)
+        if row is None:
+            return
+        entry = self.pending.get(row)
+        if entry is None:
+            entry = self.pending[row] = [int(self.position[row]), float(self.cash[row])]
+        if side == "BUY":
+            entry[0] += trade.qty
+            entry[1] -= trade.price * trade.qty
+        else:
+            entry[0] -= trade.qty
+            entry[1] += trade.price * trade.qty
+
+    def flush(self):
+        if not self.pending:
+            return
+        rows = list(self.pending)
+        position, cash = zip(*self.pending.values())
+        self.position[rows] = position
+        self.cash[rows] = cash
+        self.pending = {}
+
+    def balance(self, row):
+        entry = self.pending.get(row)
+        return float(self.cash[row]) if entry is None else entry[1]
+
+    def inventory(self, row):
+        entry = self.pending.get(row)
+        return int(self.position[row]) if entry is None else entry[0]
+
+    def positions(self):
+        # Inventory of every account, in row order
+        self.flush()
+        return self.position[:len(self.agent_ids)]
+
+    def mark_to_market(self, price):
+        # Trading PnL of every account at `price`
+        self.flush()
+        n = len(self.agent_ids)
+        return (self.cash[:n] - self.initial_cash[:n]) + (self.position[:n] - self.initial_position[:n]) * price
+
+    def on_snapshot(self, time, snapshot, depth):
+        bid, ask = snapshot.best_bid(), snapshot.best_ask()
+        if bid is not None and ask is not None:
+            self.pnl.append((time, self.mark_to_market((bid + ask) / 2)))
+
+    def pnl_df(self):
+        # One row per snapshot, one column per agent
+        n = len(self.agent_ids)
+        times = [time for time, _ in self.pnl]
+        values = [pnl[:n] for _, pnl in self.pnl]
+        return pd.DataFrame(values, index=times, columns=self.agent_ids)
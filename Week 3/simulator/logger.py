@@ -1,4 +1,5 @@
 import pandas as pd
+from bus import TRADE, SNAPSHOT
 
 class Logger:
     def __init__(self):
@@ -6,6 +7,42 @@ class Logger:
         self.l1 = []
         self.l2 = []
         self.inventory = []
+        self.agents = {}
+        self.populations = {}
+        self.muted = set()  # agent ids / population prefixes without inventory rows
+        self.engine = None
+
+    def attach(self, engine):
+        self.engine = engine
+        self.agents = engine.agents
+        # Engines without populations / ledger (vector_engine) log agents only
+        self.populations = getattr(engine, "populations", {})
+        engine.bus.subscribe(TRADE, self.on_trade)
+        engine.bus.subscribe(SNAPSHOT, self.on_snapshot)
+
+    def on_trade(self, time, trade):
+        self.record_trade(trade)
+
+    def on_snapshot(self, time, snapshot, depth):
+        if snapshot.best_bid() is not None and snapshot.best_ask() is not None:
+            self.record_l1(time, snapshot.best_bid(), snapshot.best_ask())
+            self.record_l2(time, snapshot.bids[:depth], snapshot.asks[:depth])
+
+        muted = self.muted
+        ledger = getattr(self.engine, "ledger", None)
+        if ledger is not None:
+            # One vector read of all accounts instead of a property per agent
+            for agent_id, inventory in zip(ledger.agent_ids, ledger.positions().tolist()):
+                if agent_id not in muted:
+                    self.record_inventory(time, agent_id, inventory)
+        else:
+            for agent in self.agents.values():
+                if hasattr(agent, "inventory") and agent.agent_id not in muted:
+                    self.record_inventory(time, agent.agent_id, agent.inventory)
+        # One row per population (net inventory of all its agents), not per member
+        for prefix, population in self.populations.items():
+            if prefix not in muted:
+                self.record_inventory(time, prefix, int(population.inventory.sum()))
 
     def record_trade(self, trade):
         self.trades.append({
@@ -1,3 +1,5 @@
+from latency import ExponentialLatency
+
 class MarketConfig:
     def __init__(
         self,
@@ -5,8 +7,11 @@ class MarketConfig:
         lot_size=1,
         mean_latency=1.0,
         snapshot_interval=1.0,
+        latency_model=None,
     ):
         self.tick_size = tick_size
         self.lot_size = lot_size
         self.mean_latency = mean_latency
-        self.snapshot_interval = snapshot_interval
\ No newline at end of file
+        self.snapshot_interval = snapshot_interval
+        # Defaults to the original exponential latency with mean_latency
+        self.latency_model = latency_model or ExponentialLatency(mean_latency)
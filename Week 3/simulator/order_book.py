@@ -8,18 +8,39 @@ class OrderBook:
         self.asks = [] # list of ( price, timestamp, order)
         self.trades = []
         self.snapshots = {}
+        self.tracer = None
+        # Incremented on every change of the resting orders (cache key)
+        self.version = 0
+        # feed.MarketDataFeed receiving incremental updates, if attached
+        self.feed = None
 
     def submit(self, order):
+        if self.tracer is not None:
+            start = self.tracer.now()
+            self._submit(order)
+            self.tracer.record(
+                "OrderBook.submit", "book", start, self.tracer.now(),
+                order.timestamp, order.order_id.split("-")[0]
+            )
+        else:
+            self._submit(order)
+
+    def _submit(self, order):
+        self.version += 1
         self._match(order)
         if order.price is not None and order.qty > 0:
             self._add(order)
         self._snapshot(order.order_id)
+        if self.feed is not None:
+            self.feed.book_changed()
 
     def _add(self, order):
         if order.side == "BUY":
             heapq.heappush(self.bids, (-order.price, order.timestamp, order))
         else:
             heapq.heappush(self.asks, (order.price, order.timestamp, order))
+        if self.feed is not None:
+            self.feed.level_delta(order.side, order.price, order.qty)
 
     def _match(self, incoming):
         opposite = self.asks if incoming.side == "BUY" else self.bids
@@ -35,14 +56,16 @@ class OrderBook:
             traded = min(incoming.qty, top.qty)
             incoming.qty -= traded
             top.qty -= traded
-            self.trades.append(
-                Trade(
-                    price=best_price,
-                    qty=traded,
-                    buy_order_id=incoming.order_id if incoming.side == "BUY" else top.order_id,
-                    sell_order_id=incoming.order_id if incoming.side == "SELL" else top.order_id,
-                )
+            trade = Trade(
+                price=best_price,
+                qty=traded,
+                buy_order_id=incoming.order_id if incoming.side == "BUY" else top.order_id,
+                sell_order_id=incoming.order_id if incoming.side == "SELL" else top.order_id,
             )
+            self.trades.append(trade)
+            if self.feed is not None:
+                self.feed.level_delta(top.side, top.price, -traded)
+                self.feed.trade(trade)
             if top.qty > 0:
                 heapq.heappush(opposite, (price, top.timestamp, top))
 
@@ -50,8 +73,19 @@ class OrderBook:
         import random
         for book in (self.bids, self.asks):
             if book and random.random() < prob:
-                book.pop(random.randrange(len(book)))
+                _, _, order = book.pop(random.randrange(len(book)))
                 heapq.heapify(book)
+                self.version += 1
+                if self.feed is not None:
+                    self.feed.level_delta(order.side, order.price, -order.qty)
+                    self.feed.book_changed()
+
+    def best_bid(self):
+        # Top of the heaps, without aggregating a snapshot
+        return self.bids[0][2].price if self.bids else None
+
+    def best_ask(self):
+        return self.asks[0][2].price if self.asks else None
 
     def _snapshot(self, order_id):
         self.snapshots[order_id] = BookSnapshot(self.bids, self.asks)
@@ -63,6 +97,13 @@ class OrderBook:
         return self.snapshots[order_id]
     
     def cancel(self, order_id):
+        self.version += 1
         for book in (self.bids, self.asks):
+            if self.feed is not None:
+                for _, _, order in book:
+                    if order.order_id == order_id:
+                        self.feed.level_delta(order.side, order.price, -order.qty)
             book[:] = [x for x in book if x[2].order_id != order_id]
             heapq.heapify(book)
+        if self.feed is not None:
+            self.feed.book_changed()
@@ -0,0 +1,102 @@
+import numpy as np
+
+from actions import PlaceMarket
+from agents import Agent
+from events import PolicyBatchEvent
+
+DEPTH = 5
+OBS_DIM = 4 * DEPTH + 3
+
+
+def observations(snapshot, mid, inventory, cash, initial_cash):
+    """
+    TradingEnv observations for a batch of accounts on the same book:
+    5 bid / 5 ask prices relative to mid, their log volumes, then
+    inventory / 100, cash / initial_cash and a zero pad. The book part is
+    built once and shared by every row. Returns float32 (n, 23).
+    """
+    inventory = np.asarray(inventory, dtype=float)
+    cash = np.asarray(cash, dtype=float)
+
+    book = np.zeros(4 * DEPTH)
+    for i, (p, v) in enumerate(snapshot.bids[:DEPTH]):
+        book[i] = (p - mid) / mid
+        book[i + DEPTH] = np.log(v + 1)
+    for i, (p, v) in enumerate(snapshot.asks[:DEPTH]):
+        book[2 * DEPTH + i] = (p - mid) / mid
+        book[3 * DEPTH + i] = np.log(v + 1)
+
+    obs = np.zeros((len(inventory), OBS_DIM))
+    obs[:, :4 * DEPTH] = book
+    obs[:, 4 * DEPTH] = inventory / 100.0
+    obs[:, 4 * DEPTH + 1] = cash / initial_cash
+    return obs.astype(np.float32)
+
+
+def load_policy(path):
+    # Trained TradingEnv policy, e.g. ppo_trading_agent_v1.zip (needs stable-baselines3)
+    from stable_baselines3 import PPO
+    return PPO.load(path)
+
+
+class PolicyBatcher:
+    """
+    Collects the arrivals of PolicyAgents over `window` seconds and decides
+    for all of them with one model.predict call on the stacked
+    observations. The actions (TradingEnv's 0 hold / 1 buy / 2 sell) go
+    out through MarketEnvironment.apply_action as market orders.
+    """
+
+    def __init__(self, model, env, window=0.05, deterministic=True, initial_cash=100_000.0):
+        self.model = model
+        self.env = env
+        self.window = window
+        self.deterministic = deterministic
+        self.initial_cash = initial_cash
+        self.pending = {}  # agent_id -> agent, an agent acts once per batch
+
+    def submit(self, agent):
+        if not self.pending:
+            engine = self.env.engine
+            engine.schedule(PolicyBatchEvent(engine.time + engine.clock.ticks(self.window), self))
+        self.pending[agent.agent_id] = agent
+
+    def flush(self):
+        agents = list(self.pending.values())
+        self.pending = {}
+        if not agents:
+            return
+
+        features = self.env.features.view
+        mid = features["mid"]
+        if mid is None:
+            mid = 100.0
+        obs = observations(
+            features["snapshot"], mid,
+            [agent.inventory for agent in agents],
+            [agent.balance for agent in agents],
+            self.initial_cash
+        )
+        actions, _ = self.model.predict(obs, deterministic=self.deterministic)
+
+        for agent, action in zip(agents, np.asarray(actions).reshape(-1).tolist()):
+            if action == 1:
+                self.env.apply_action(agent, PlaceMarket("BUY", agent.qty))
+            elif action == 2:
+                self.env.apply_action(agent, PlaceMarket("SELL", agent.qty))
+
+
+class PolicyAgent(Agent):
+    # Background agent driven by a trained policy; decisions are batched by a PolicyBatcher
+
+    market_fields = ()
+
+    def __init__(self, agent_id, batcher, arrival_rate=1.0, qty=1, cash=100_000):
+        super().__init__(agent_id, arrival_rate)
+        self.batcher = batcher
+        self.qty = qty
+        self.balance = cash
+
+    def get_action(self, market_state):
+        self.batcher.submit(self)
+        return None
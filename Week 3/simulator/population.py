@@ -0,0 +1,148 @@
+import random
+
+import numpy as np
+
+from actions import PlaceLimit, PlaceMarket
+from events import PopulationArrivalEvent
+from rng import BufferedStream
+
+
+class PopulationMember:
+    """
+    Per-agent handle into an AgentPopulation, created only for agents that
+    actually place orders. It carries what the environment and matching
+    path need (agent_id, rng, active_orders, on_trade); cash and inventory
+    stay in the population arrays.
+    """
+
+    __slots__ = ("population", "index", "agent_id", "active_orders")
+
+    def __init__(self, population, index):
+        self.population = population
+        self.index = index
+        self.agent_id = f"{population.prefix}{index}"
+        self.active_orders = {}
+
+    @property
+    def rng(self):
+        return self.population.stream
+
+    @property
+    def inventory(self):
+        return int(self.population.inventory[self.index])
+
+    @property
+    def balance(self):
+        return float(self.population.balance[self.index])
+
+    def on_trade(self, trade, side):
+        self.population.on_trade(self.index, trade, side)
+
+
+class AgentPopulation:
+    """
+    Struct-of-arrays storage for n homogeneous agents: cash, inventory and
+    arrival rates are NumPy arrays. Arrivals are collected over time slices
+    of `slice` seconds and decided for all arriving agents in one vectorized
+    call; an agent arriving twice within a slice acts once.
+    """
+
+    def __init__(self, prefix, n, arrival_rate=1.0, cash=10_000, inventory=0, slice=0.1, rng=None):
+        self.prefix = prefix
+        self.n = n
+        self.arrival_rate = np.broadcast_to(np.asarray(arrival_rate, dtype=float), (n,)).copy()
+        self.cumulative_rate = np.cumsum(self.arrival_rate)
+        self.total_rate = float(self.cumulative_rate[-1])
+        self.balance = np.full(n, cash, dtype=float)
+        self.inventory = np.full(n, inventory, dtype=np.int64)
+        self.slice = slice
+        if rng is None:
+            rng = np.random.default_rng(random.getrandbits(64))  # follows the global random seed
+        self.rng = rng
+        self.stream = BufferedStream(rng)  # latency draws of the members
+        self.members = {}
+        self.engine = None
+
+    def member(self, index):
+        member = self.members.get(index)
+        if member is None:
+            member = self.members[index] = PopulationMember(self, index)
+        return member
+
+    def reseed(self, streams):
+        # New random paths after a Checkpoint fork; same key as scenario.build
+        self.rng = streams.generator(self.prefix)
+        self.stream = BufferedStream(self.rng)
+
+    def start(self, engine, env):
+        self.engine = engine
+        # Members stay out of engine.agents; fills reach them via engine.agent()
+        engine.populations[self.prefix] = self
+        engine.schedule(PopulationArrivalEvent(engine.clock.ticks(self.slice), self, env))
+
+    def arrivals(self):
+        k = self.rng.poisson(self.total_rate * self.slice)
+        u = self.rng.random(k) * self.total_rate
+        return np.unique(np.searchsorted(self.cumulative_rate, u, side="right"))
+
+    def act(self):
+        # Returns (member, action) pairs for this slice
+        index = self.arrivals()
+        if not len(index):
+            return []
+        return self.decide(index)
+
+    def decide(self, index):
+        raise NotImplementedError
+
+    def on_trade(self, index, trade, side):
+        if side == "BUY":
+            self.inventory[index] += trade.qty
+            self.balance[index] -= trade.price * trade.qty
+        else:
+            self.inventory[index] -= trade.qty
+            self.balance[index] += trade.price * trade.qty
+
+
+class NoiseTraderPopulation(AgentPopulation):
+    # Vectorized NoiseTraderAgent: same budget / inventory checks and order mix
+
+    def __init__(
+        self,
+        prefix,
+        n,
+        fair_value_process,
+        arrival_rate=1.0,
+        max_qty=5,
+        cash=10_000,
+        inventory=10,
+        p_market=0.7,
+        slice=0.1,
+        rng=None
+    ):
+        super().__init__(prefix, n, arrival_rate, cash, inventory, slice, rng)
+        self.fair_value = fair_value_process
+        self.max_qty = max_qty
+        self.p_market = p_market
+
+    def decide(self, index):
+        m = len(index)
+        rng = self.rng
+        buy = rng.random(m) < 0.5
+        qty = rng.integers(1, self.max_qty + 1, m)
+        market = rng.random(m) < self.p_market
+        offset = rng.integers(-4, 5, m)
+
+        fv = self.fair_value.get()
+        ok = np.where(buy, self.balance[index] >= fv * qty, self.inventory[index] >= qty)
+
+        actions = []
+        for i in np.flatnonzero(ok).tolist():
+            side = "BUY" if buy[i] else "SELL"
+            q = int(qty[i])
+            if market[i]:
+                action = PlaceMarket(side, q)
+            else:
+                action = PlaceLimit(side, fv + int(offset[i]), q)
+            actions.append((self.member(int(index[i])), action))
+        return actions
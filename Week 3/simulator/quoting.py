@@ -0,0 +1,51 @@
+import math
+
+from actions import Amend, Cancel, PlaceLimit
+
+
+def round_to_tick(side, price, tick_size):
+    # Passive rounding: bids down, asks up (as MarketEnvironment does)
+    if side == "BUY":
+        return math.floor(price / tick_size) * tick_size
+    return math.ceil(price / tick_size) * tick_size
+
+
+class Quoter:
+    """
+    Keeps at most one live quote per side for a liquidity provider and turns
+    desired quotes into the difference with the live ones, after tick
+    rounding: a new quote, a cancel, or an amend (cancel-replace). Quotes
+    that are already right are left alone and keep their queue priority.
+    """
+
+    def __init__(self, tick_size):
+        self.tick_size = tick_size
+        self.live = {}  # side -> PlaceLimit (order_id set once placed)
+
+    def update(self, active_orders, quotes):
+        # quotes: {side: (price, qty)}; a missing side is pulled
+        actions = []
+        for side in ("BUY", "SELL"):
+            live = self.live.get(side)
+            remaining = None if live is None else active_orders.get(live.order_id)
+            if live is not None and remaining is None:
+                # Fully filled (or never placed)
+                del self.live[side]
+                live = None
+
+            wanted = quotes.get(side)
+            if wanted is None:
+                if live is not None:
+                    actions.append(Cancel(live.order_id))
+                    del self.live[side]
+                continue
+
+            price = round_to_tick(side, wanted[0], self.tick_size)
+            qty = wanted[1]
+            if live is not None and live.price == price and remaining == qty:
+                continue
+
+            limit = PlaceLimit(side, price, qty)
+            actions.append(limit if live is None else Amend(live.order_id, limit))
+            self.live[side] = limit
+        return actions
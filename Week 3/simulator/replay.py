@@ -0,0 +1,129 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+BAR_DTYPE = np.dtype([
+    ("time", "i8"),  # bar start, ns since epoch
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+COLUMN_ALIASES = {
+    "date": "time",
+    "datetime": "time",
+    "timestamp": "time",
+    "close/last": "close",
+}
+
+
+def normalize_bars(chunk):
+    chunk = chunk.rename(columns=lambda c: COLUMN_ALIASES.get(c.strip().lower(), c.strip().lower()))
+    out = np.empty(len(chunk), dtype=BAR_DTYPE)
+    out["time"] = pd.to_datetime(chunk["time"]).to_numpy(dtype="datetime64[ns]").view("i8")
+    for col in ("open", "high", "low", "close", "volume"):
+        values = chunk[col]
+        if not pd.api.types.is_numeric_dtype(values):
+            # e.g. AAPL.csv stores prices as "$278.78"
+            values = values.str.replace(r"[$,]", "", regex=True)
+        out[col] = values.astype(float)
+    return out
+
+
+def convert_bars(csv_path, out_path, chunksize=1_000_000):
+    """
+    One-off conversion of an OHLCV bar CSV (AAPL.csv, NIFTY 50 minute files)
+    into a time-sorted .npy file that ReplayFairValueProcess memory-maps.
+    The CSV is streamed in chunks, so files larger than memory are fine.
+    """
+    raw_path = out_path + ".tmp"
+    rows = 0
+    with open(raw_path, "wb") as raw:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            bars = normalize_bars(chunk.dropna())
+            bars.tofile(raw)
+            rows += len(bars)
+
+    raw = np.memmap(raw_path, dtype=BAR_DTYPE, mode="r", shape=(rows,))
+    times = raw["time"]
+    if rows > 1 and times[0] > times[-1] and (np.diff(times) <= 0).all():
+        order = slice(None, None, -1)  # newest first (AAPL.csv)
+    elif (np.diff(times) >= 0).all():
+        order = slice(None)
+    else:
+        order = np.argsort(times, kind="stable")
+
+    out = np.lib.format.open_memmap(out_path, mode="w+", dtype=BAR_DTYPE, shape=(rows,))
+    if isinstance(order, slice):
+        source = raw[order]
+        for start in range(0, rows, chunksize):
+            out[start:start + chunksize] = source[start:start + chunksize]
+    else:
+        for start in range(0, rows, chunksize):
+            out[start:start + chunksize] = raw[order[start:start + chunksize]]
+    out.flush()
+    del out, raw
+    os.remove(raw_path)
+    return rows
+
+
+class ReplayFairValueProcess:
+    """
+    Fair value replayed from a converted bar file.
+
+    Bars are laid end to end in sim time, each lasting bar_duration seconds
+    (overnight and weekend gaps collapse), so a query is O(1) index
+    arithmetic on the memory-mapped array. Within a bar the value moves
+    open -> low -> high -> close (or open -> high -> low -> close on down
+    bars) linearly. rebase scales the series so the first open equals it.
+    Same get()/step() contract as FairValueProcess.
+    """
+
+    def __init__(self, path, bar_duration=60.0, start_bar=0, rebase=None, dt=1.0):
+        self.bars = np.load(path, mmap_mode="r")
+        self.bar_duration = bar_duration
+        self.start_bar = start_bar
+        self.scale = 1.0 if rebase is None else rebase / float(self.bars["open"][start_bar])
+        self.dt = dt
+        self.t = 0.0
+        self.engine = None
+        self.value = self.get(0.0)
+
+    def attach(self, engine):
+        self.engine = engine
+
+    def step(self):
+        self.t += self.dt
+        return self.get(self.t)
+
+    def get(self, t=None):
+        if t is None:
+            if self.engine is None:
+                return self.value
+            t = self.engine.clock.seconds(self.engine.time)
+
+        pos = t / self.bar_duration
+        i = self.start_bar + int(pos)
+        if i >= len(self.bars):
+            self.value = float(self.bars["close"][-1]) * self.scale
+            return self.value
+
+        bar = self.bars[i]
+        o, h, l, c = float(bar["open"]), float(bar["high"]), float(bar["low"]), float(bar["close"])
+        path = (o, l, h, c) if c >= o else (o, h, l, c)
+
+        frac = (pos - int(pos)) * 3
+        leg = min(int(frac), 2)
+        w = frac - leg
+        self.value = (path[leg] + w * (path[leg + 1] - path[leg])) * self.scale
+        return self.value
+
+
+if __name__ == "__main__":
+    # python replay.py "Week 0/Day 1/AAPL.csv" aapl.npy
+    n = convert_bars(sys.argv[1], sys.argv[2])
+    print(f"{n} bars written to {sys.argv[2]}")
@@ -0,0 +1,134 @@
+from collections import Counter
+
+
+class RiskLimits:
+    # None disables a check. max_order_rate is orders per second with bursts
+    # of up to `burst` orders (token bucket).
+    def __init__(
+        self,
+        max_position=None,
+        max_open_notional=None,
+        max_order_rate=None,
+        burst=5,
+        check_cash=True
+    ):
+        self.max_position = max_position
+        self.max_open_notional = max_open_notional
+        self.max_order_rate = max_order_rate
+        self.burst = burst
+        self.check_cash = check_cash
+
+
+class Exposure:
+    # Running open-order totals of one agent
+    __slots__ = ("buy_qty", "sell_qty", "buy_notional", "sell_notional", "tokens", "last_time")
+
+    def __init__(self, burst):
+        self.buy_qty = self.sell_qty = 0
+        self.buy_notional = self.sell_notional = 0.0
+        self.tokens = burst
+        self.last_time = None
+
+    def add(self, side, price, qty):
+        if side == "BUY":
+            self.buy_qty += qty
+            self.buy_notional += price * qty
+        else:
+            self.sell_qty += qty
+            self.sell_notional += price * qty
+
+
+class RiskGate:
+    """
+    Pre-trade checks for MarketEnvironment.apply_action: position limit
+    including open orders, open notional, cash against open buys and order
+    rate. Open exposure is kept as running per-agent totals, updated on
+    placement, fill, cancel and when the unfilled rest of a market order
+    is dropped, so every check is O(1).
+
+    RiskGate(RiskLimits(max_position=50), {"MomentumAgent": RiskLimits(max_order_rate=0.5)})
+    """
+
+    def __init__(self, limits=None, by_class=None):
+        self.limits = limits if limits is not None else RiskLimits()
+        self.by_class = dict(by_class or {})
+        self.exposures = {}  # agent_id -> Exposure
+        self.orders = {}  # order_id -> [exposure, side, price, remaining]
+        self.rejected = Counter()
+
+    def limits_for(self, agent):
+        return self.by_class.get(type(agent).__name__, self.limits)
+
+    def exposure(self, agent_id, limits):
+        exposure = self.exposures.get(agent_id)
+        if exposure is None:
+            exposure = self.exposures[agent_id] = Exposure(limits.burst)
+        return exposure
+
+    def check(self, agent_id, inventory, balance, side, price, qty, now, limits=None):
+        # price: limit price, or a reference price for market orders (None: skip notional checks)
+        limits = limits or self.limits
+        exposure = self.exposure(agent_id, limits)
+
+        if limits.max_order_rate is not None:
+            if exposure.last_time is not None:
+                refill = (now - exposure.last_time) * limits.max_order_rate
+                exposure.tokens = min(limits.burst, exposure.tokens + refill)
+            exposure.last_time = now
+            if exposure.tokens < 1:
+                return self._reject("order_rate")
+
+        if limits.max_position is not None:
+            if side == "BUY" and inventory + exposure.buy_qty + qty > limits.max_position:
+                return self._reject("position")
+            if side == "SELL" and inventory - exposure.sell_qty - qty < -limits.max_position:
+                return self._reject("position")
+
+        if price is not None:
+            notional = price * qty
+            if limits.max_open_notional is not None:
+                open_notional = exposure.buy_notional if side == "BUY" else exposure.sell_notional
+                if open_notional + notional > limits.max_open_notional:
+                    return self._reject("open_notional")
+            if limits.check_cash and side == "BUY" and balance - exposure.buy_notional < notional:
+                return self._reject("cash")
+
+        if limits.max_order_rate is not None:
+            exposure.tokens -= 1
+        return True
+
+    def _reject(self, reason):
+        self.rejected[reason] += 1
+        return False
+
+    def accept(self, agent, order, price, now):
+        # Checks an order about to be sent and, if accepted, opens its exposure
+        limits = self.limits_for(agent)
+        if not self.check(
+            agent.agent_id, agent.inventory, agent.balance,
+            order.side, price, order.qty, now, limits
+        ):
+            return False
+        if price is not None:
+            exposure = self.exposures[agent.agent_id]
+            exposure.add(order.side, price, order.qty)
+            self.orders[order.order_id] = [exposure, order.side, price, order.qty]
+        return True
+
+    def _release(self, entry, qty):
+        exposure, side, price, _ = entry
+        exposure.add(side, price, -qty)
+        entry[3] -= qty
+
+    def on_fill(self, order_id, qty):
+        entry = self.orders.get(order_id)
+        if entry is not None:
+            self._release(entry, min(qty, entry[3]))
+            if entry[3] <= 0:
+                del self.orders[order_id]
+
+    def on_close(self, order_id):
+        # Cancelled, or the unfilled rest of a market order was dropped
+        entry = self.orders.pop(order_id, None)
+        if entry is not None:
+            self._release(entry, entry[3])
@@ -0,0 +1,87 @@
+import hashlib
+
+import numpy as np
+
+
+class BufferedStream:
+    """
+    Per-agent random stream with the subset of the `random` module API the
+    agents use. Uniforms and exponentials are drawn from a NumPy Generator
+    in bulk and served from buffers, so each agent's draws depend only on
+    its own stream, not on how events interleave.
+    """
+
+    def __init__(self, generator, buffer_size=256):
+        self.generator = generator
+        self.buffer_size = buffer_size
+        self.uniforms = []
+        self.exponentials = []
+
+    def random(self):
+        if not self.uniforms:
+            self.uniforms = self.generator.random(self.buffer_size).tolist()
+        return self.uniforms.pop()
+
+    def expovariate(self, lambd):
+        if not self.exponentials:
+            self.exponentials = self.generator.standard_exponential(self.buffer_size).tolist()
+        return self.exponentials.pop() / lambd
+
+    def randint(self, a, b):
+        return a + int(self.random() * (b - a + 1))
+
+    def randrange(self, n):
+        return int(self.random() * n)
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+
+def _key_words(key):
+    # Stable across processes and platforms (unlike hash())
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+    return tuple(int.from_bytes(digest[i:i + 4], "little") for i in (0, 4))
+
+
+class RNGService:
+    """
+    Hands out one BufferedStream per key (agent id, agent class, "latency", ...).
+
+    Streams are counter-based (Philox) and derived from (seed, key path,
+    stream key) only: RNGService(seed).child(scenario, replication) gives the
+    same streams whether a replication runs alone, in a process pool or on
+    another machine, and never depends on creation order.
+    """
+
+    def __init__(self, seed=None, key=(), buffer_size=256):
+        self.entropy = np.random.SeedSequence(seed).entropy
+        self.key = tuple(key)
+        self.buffer_size = buffer_size
+        self.streams = {}
+
+    def child(self, *key):
+        return RNGService(self.entropy, self.key + key, self.buffer_size)
+
+    def seed_sequence(self, key):
+        return np.random.SeedSequence(
+            self.entropy,
+            spawn_key=_key_words(self.key) + _key_words(key),
+        )
+
+    def seed(self, key):
+        # Integer seed for components taking `seed=` (e.g. fair value processes)
+        words = self.seed_sequence(key).generate_state(4)
+        return int.from_bytes(words.tobytes(), "little")
+
+    def generator(self, key):
+        return np.random.Generator(np.random.Philox(self.seed_sequence(key)))
+
+    def stream(self, key):
+        stream = self.streams.get(key)
+        if stream is None:
+            stream = self.streams[key] = BufferedStream(self.generator(key), self.buffer_size)
+        return stream
+
+    def assign(self, agents):
+        for agent in agents:
+            agent.rng = self.stream(agent.agent_id)
@@ -1,4 +1,5 @@
-import random
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -6,20 +7,7 @@ import mplfinance as mpf
 
 from matplotlib.backends.backend_pdf import PdfPages
 
-from order_book import OrderBook
-from engine import MarketEngine
-from environment import MarketEnvironment
-from logger import Logger
-from market_config import MarketConfig
-from fair_value import FairValueProcess
-
-from agents import NoiseTraderAgent, MarketMakerAgent, MomentumAgent
-from events import (
-    AgentArrivalEvent,
-    MarketCloseEvent,
-    SnapshotEvent,
-    FairValueUpdateEvent,
-)
+from scenario import run as run_scenario
 
 # ============================================================
 # HARD CONSTRAINTS (NON-NEGOTIABLE)
@@ -39,59 +27,39 @@ SCENARIOS = {
 # CORE SIMULATION
 # ============================================================
 
-def run_single_scenario(cfg, seed):
-    random.seed(seed)
-    np.random.seed(seed)
-
-    book = OrderBook()
-    logger = Logger()
-    engine = MarketEngine(book, logger)
-    env = MarketEnvironment(
-        engine,
-        MarketConfig(snapshot_interval=SNAPSHOT_INTERVAL)
-    )
-
-    fv = FairValueProcess(initial_value=100.0, sigma=0.5, seed=SEED)
-
-    agents = []
-
-    for i in range(cfg["noise"]):
-        agents.append(
-            NoiseTraderAgent(f"N{i}", fv, arrival_rate=1.2)
-        )
-
-    for i in range(cfg["mm"]):
-        agents.append(
-            MarketMakerAgent(
-                f"MM{i}",
-                fv,
-                arrival_rate=0.2,
-                base_spread=1.0,
-                inventory_skew=0.2
-            )
-        )
+def scenario_spec(cfg):
+    # Scenario spec (see scenario.py) for one of the SCENARIOS agent mixes
+    return {
+        "duration": SIMULATION_TIME,
+        "market": {"snapshot_interval": SNAPSHOT_INTERVAL},
+        "fair_value": {"model": "random_walk", "initial_value": 100.0, "sigma": 0.5, "dt": 1.0},
+        "agents": [
+            {"type": "NoiseTraderAgent", "count": cfg["noise"], "prefix": "N",
+             "params": {"arrival_rate": 1.2}},
+            {"type": "MarketMakerAgent", "count": cfg["mm"], "prefix": "MM",
+             "params": {"arrival_rate": 0.2, "base_spread": 1.0, "inventory_skew": 0.2}},
+            {"type": "MomentumAgent", "count": cfg["momentum"], "prefix": "M",
+             "params": {"window": 50, "arrival_rate": 1.0}},
+        ],
+    }
 
-    for i in range(cfg["momentum"]):
-        agents.append(
-            MomentumAgent(
-                f"M{i}",
-                window=50,
-                arrival_rate=1.0
-            )
-        )
 
-    for agent in agents:
-        engine.agents[agent.agent_id] = agent
-        engine.schedule(
-            AgentArrivalEvent(agent.next_event_time(0), agent, env)
-        )
+def run_single_scenario(cfg, seed, scenario, replication=0):
+    # Every random source is keyed by (experiment seed, scenario, replication, component),
+    # so a replication is reproducible on its own, in a process pool or elsewhere.
+    # scenario is required: configs must not share another scenario's streams
+    return run_scenario(scenario_spec(cfg), seed, scenario, replication)
 
-    engine.schedule(SnapshotEvent(0, env))
-    engine.schedule(FairValueUpdateEvent(0, fv, dt=1.0))
-    engine.schedule(MarketCloseEvent(SIMULATION_TIME))
 
-    engine.run()
-    return logger
+def run_replications(label, replications, seed=SEED, processes=None):
+    # Monte Carlo replications of one scenario in a process pool
+    cfg = SCENARIOS[label]
+    with ProcessPoolExecutor(processes) as pool:
+        futures = [
+            pool.submit(run_single_scenario, cfg, seed, label, r)
+            for r in range(replications)
+        ]
+        return [f.result() for f in futures]
 
 # ============================================================
 # METRICS & OHLC
@@ -282,8 +250,8 @@ def main():
     results = {}
     ohlcs = {}
 
-    for i, (label, cfg) in enumerate(SCENARIOS.items()):
-        logger = run_single_scenario(cfg, seed=SEED + i * 100)
+    for label, cfg in SCENARIOS.items():
+        logger = run_single_scenario(cfg, seed=SEED, scenario=label)
         results[label] = extract_metrics(logger)
         ohlcs[label] = generate_ohlc(logger.trades_df())
 
@@ -0,0 +1,237 @@
+"""
+Declarative scenarios (JSON, TOML or YAML):
+
+    name = "noise_1m"                 # RNG stream key (default: hash of the spec)
+    duration = 1800
+    calibration = "calibrated.json"   # optional: market / fair_value / arrival_profile defaults
+
+    [market]
+    snapshot_interval = 1.0
+
+    [fair_value]
+    model = "random_walk"             # random_walk | gbm | ou | merton | replay
+    sigma = 0.5
+
+    [[agents]]
+    type = "NoiseTraderAgent"
+    count = 1_000_000
+    prefix = "N"
+    params = { arrival_rate = 1.2 }
+    log = false                       # no inventory rows for this group (default: logged)
+
+    [[agents]]
+    type = "PolicyAgent"              # trained TradingEnv policy, batched inference
+    count = 1000
+    model = "../ppo_trading_agent_v1.zip"
+    window = 0.05
+
+Groups of a type with an array-backed population (POPULATIONS) are built
+as one population once count reaches COMPACT_THRESHOLD (or compact = true):
+NumPy state, one shared parameter set and per-agent objects only for the
+agents that actually trade. Other groups get one agent object each.
+Logged groups get one inventory row per agent at every snapshot, except
+populations, which get one row with their net inventory.
+"""
+
+import hashlib
+import json
+import os
+import random
+import sys
+import tomllib
+
+import numpy as np
+
+try:
+    import yaml
+except ImportError:  # YAML specs are optional
+    yaml = None
+
+from agents import MarketMakerAgent, MomentumAgent, NoiseTraderAgent, RandomAgent
+from arrivals import IntensityProfile, SeasonalArrivals
+from engine import MarketEngine
+from environment import MarketEnvironment
+from events import AgentArrivalEvent, MarketCloseEvent, SnapshotEvent
+from fair_value import GBMProcess, LazyFairValueProcess, MertonJumpProcess, OUProcess
+from ledger import Ledger
+from logger import Logger
+from market_config import MarketConfig
+from order_book import OrderBook
+from policy import PolicyAgent, PolicyBatcher, load_policy
+from population import NoiseTraderPopulation
+from replay import ReplayFairValueProcess
+from rng import RNGService
+
+AGENT_TYPES = {
+    "NoiseTraderAgent": NoiseTraderAgent,
+    "MarketMakerAgent": MarketMakerAgent,
+    "MomentumAgent": MomentumAgent,
+    "RandomAgent": RandomAgent,
+}
+
+# Agents anchored to the fair value take it as second constructor argument
+FAIR_VALUE_AGENTS = {"NoiseTraderAgent", "MarketMakerAgent"}
+
+# Agents quoting on the market's tick grid take its tick_size
+TICK_AGENTS = {"MarketMakerAgent"}
+
+POPULATIONS = {
+    "NoiseTraderAgent": NoiseTraderPopulation,
+}
+
+FAIR_VALUE_MODELS = {
+    "random_walk": LazyFairValueProcess,
+    "gbm": GBMProcess,
+    "ou": OUProcess,
+    "merton": MertonJumpProcess,
+}
+
+COMPACT_THRESHOLD = 10_000
+
+
+def load_scenario(path):
+    with open(path, "rb") as f:
+        if path.endswith(".toml"):
+            spec = tomllib.load(f)
+        elif path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ImportError("YAML scenarios need PyYAML (pip install pyyaml)")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+
+    calibration = spec.get("calibration")
+    if calibration is not None:
+        # Calibration output (calibration.py) gives defaults, the spec overrides
+        with open(os.path.join(os.path.dirname(path), calibration)) as f:
+            calibrated = json.load(f)
+        for section in ("market", "fair_value", "arrival_profile"):
+            if section in calibrated:
+                spec[section] = {**calibrated[section], **spec.get(section, {})}
+    return spec
+
+
+def make_fair_value(spec, seed):
+    params = dict(spec)
+    model = params.pop("model", "random_walk")
+    if model == "replay":
+        return ReplayFairValueProcess(**params)
+    if model not in FAIR_VALUE_MODELS:
+        raise ValueError(f"Unknown fair value model: {model}")
+    return FAIR_VALUE_MODELS[model](seed=seed, **params)
+
+
+def make_group(group, fv, streams, env):
+    # One population, or a list of agents
+    kind = group["type"]
+    count = group.get("count", 1)
+    prefix = group.get("prefix", kind)
+    params = group.get("params", {})
+
+    if kind == "PolicyAgent":
+        # One batcher (and model) per group
+        batcher = PolicyBatcher(load_policy(group["model"]), env, window=group.get("window", 0.05))
+        return [PolicyAgent(f"{prefix}{i}", batcher, **params) for i in range(count)]
+
+    compact = group.get("compact")
+    if compact is None:
+        compact = kind in POPULATIONS and count >= COMPACT_THRESHOLD
+    if compact:
+        if kind not in POPULATIONS:
+            raise ValueError(f"{kind} has no array-backed population")
+        extra = {"slice": group["slice"]} if "slice" in group else {}
+        return POPULATIONS[kind](prefix, count, fv, rng=streams.generator(prefix), **params, **extra)
+
+    cls = AGENT_TYPES[kind]
+    if kind in TICK_AGENTS:
+        params = {"tick_size": env.config.tick_size, **params}
+    if kind in FAIR_VALUE_AGENTS:
+        return [cls(f"{prefix}{i}", fv, **params) for i in range(count)]
+    return [cls(f"{prefix}{i}", **params) for i in range(count)]
+
+
+def scenario_key(spec):
+    # Stream key of a spec: its name, else a hash of its content, so
+    # different specs never share random streams by accident
+    name = spec.get("name")
+    if name is not None:
+        return name
+    content = json.dumps(spec, sort_keys=True, default=str).encode()
+    return "spec-" + hashlib.blake2b(content, digest_size=8).hexdigest()
+
+
+def build(spec, seed, scenario=None, replication=0):
+    """
+    Builds a ready-to-run engine for a scenario spec. Random sources are
+    keyed by (seed, scenario, replication, component) as in run_simulation;
+    scenario defaults to scenario_key(spec).
+    """
+    if scenario is None:
+        scenario = scenario_key(spec)
+    streams = RNGService(seed).child(scenario, replication)
+    random.seed(streams.seed("random"))
+    np.random.seed(streams.seed("numpy") % 2**32)
+
+    book = OrderBook()
+    logger = Logger()
+    engine = MarketEngine(book, logger)
+    env = MarketEnvironment(engine, MarketConfig(**spec.get("market", {})))
+
+    fv = make_fair_value(spec.get("fair_value", {}), streams.seed("fair_value"))
+    if hasattr(fv, "attach"):
+        fv.attach(engine)
+
+    agents = []
+    populations = []
+    for group in spec.get("agents", []):
+        built = make_group(group, fv, streams, env)
+        if isinstance(built, list):
+            agents.extend(built)
+            if not group.get("log", True):
+                logger.muted.update(agent.agent_id for agent in built)
+        else:
+            populations.append(built)
+            if not group.get("log", True):
+                logger.muted.add(built.prefix)
+
+    # Independent buffered random stream per agent
+    streams.assign(agents)
+
+    profile = spec.get("arrival_profile")
+    if profile is not None:
+        # Populations keep homogeneous arrivals
+        profile = IntensityProfile(
+            profile["multipliers"], profile.get("bucket_seconds", 60.0), profile.get("time_scale", 1.0)
+        )
+        for agent in agents:
+            agent.arrival_process = SeasonalArrivals(
+                agent.arrival_rate, profile, seed=streams.seed(("arrivals", agent.agent_id))
+            )
+
+    for agent in agents:
+        engine.agents[agent.agent_id] = agent
+        engine.schedule(
+            AgentArrivalEvent(engine.clock.ticks(agent.next_event_time(0)), agent, env)
+        )
+    for population in populations:
+        population.start(engine, env)
+
+    engine.schedule(SnapshotEvent(0, env))
+    engine.schedule(MarketCloseEvent(engine.clock.ticks(spec.get("duration", 1800.0))))
+
+    # All accounts in one ledger, marked to market at every snapshot
+    Ledger().attach(engine)
+    return engine
+
+
+def run(spec, seed, scenario=None, replication=0):
+    engine = build(spec, seed, scenario, replication)
+    engine.run()
+    return engine.logger
+
+
+if __name__ == "__main__":
+    # python scenario.py scenario.toml [seed]
+    spec = load_scenario(sys.argv[1])
+    logger = run(spec, int(sys.argv[2]) if len(sys.argv) > 2 else 42)
+    print(f"{len(logger.trades)} trades, {len(logger.l1)} L1 snapshots")
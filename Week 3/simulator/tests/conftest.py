@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Simulator modules import each other as top-level modules
+HERE = os.path.dirname(__file__)
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, os.path.dirname(os.path.dirname(HERE)))
@@ -0,0 +1,47 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from calibration import Calibrator, calibrate
+from replay import BAR_DTYPE
+
+
+def minute_bars(days=3, minutes=30, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-01-02 09:15")
+    times = [start + pd.Timedelta(days=d, minutes=m) for d in range(days) for m in range(minutes)]
+    close = 100 * np.exp(np.cumsum(0.001 * rng.standard_normal(len(times))))
+    return pd.DataFrame({
+        "date": times, "open": close, "high": close, "low": close, "close": close,
+        "volume": rng.integers(100, 1000, len(times)),
+    })
+
+
+def test_newest_first_csv_matches_oldest_first(tmp_path):
+    bars = minute_bars()
+    bars.to_csv(tmp_path / "ascending.csv", index=False)
+    bars.iloc[::-1].to_csv(tmp_path / "descending.csv", index=False)
+
+    ascending = calibrate(str(tmp_path / "ascending.csv"))
+    descending = calibrate(str(tmp_path / "descending.csv"))
+    sigma = descending["fair_value"]["sigma"]
+    assert math.isfinite(sigma) and sigma > 0
+    assert sigma == pytest.approx(ascending["fair_value"]["sigma"])
+    assert descending["calibration"]["bar_seconds"] == 60.0
+
+
+def test_unsorted_bars_are_rejected():
+    bars = np.zeros(3, dtype=BAR_DTYPE)
+    bars["time"] = [3, 2, 1]
+    bars["close"] = 100.0
+    with pytest.raises(ValueError, match="ascending"):
+        Calibrator().update(bars)
+
+
+def test_daily_bars_have_no_intraday_returns(tmp_path):
+    bars = minute_bars(days=20, minutes=1)
+    bars.to_csv(tmp_path / "daily.csv", index=False)
+    with pytest.raises(ValueError, match="intraday"):
+        calibrate(str(tmp_path / "daily.csv"))
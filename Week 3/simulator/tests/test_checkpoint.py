@@ -0,0 +1,45 @@
+from scenario import build
+from trading_env import TradingEnv
+
+POPULATION_SPEC = {
+    "name": "population_fork",
+    "duration": 15.0,
+    "agents": [
+        {"type": "NoiseTraderAgent", "count": 1000, "compact": True, "prefix": "N",
+         "params": {"arrival_rate": 0.05}},
+        {"type": "MarketMakerAgent", "count": 2, "prefix": "MM"},
+    ],
+}
+
+
+def trade_tuples(engine):
+    return [(t.price, t.qty, t.buy_order_id, t.sell_order_id) for t in engine.order_book.trades]
+
+
+def test_fork_with_population_is_reproducible_per_seed():
+    engine = build(POPULATION_SPEC, 42)
+    engine.run_until(engine.clock.ticks(5.0))
+    checkpoint = engine.checkpoint()
+
+    def run_fork(seed):
+        forked = checkpoint.fork(seed)[0]
+        forked.run()
+        return trade_tuples(forked)
+
+    assert run_fork(1) == run_fork(1)
+    assert run_fork(1) != run_fork(2)
+
+
+def episode_rewards(env, seed=None, steps=20):
+    env.reset(seed=seed)
+    return [env.step(i % 3)[1] for i in range(steps)]
+
+
+def test_cached_warmup_unseeded_resets_differ():
+    env = TradingEnv(num_noise_traders=20, num_market_makers=4, num_momentum_traders=2, cache_warmup=True)
+    assert episode_rewards(env) != episode_rewards(env)
+
+
+def test_cached_warmup_seeded_resets_replay():
+    env = TradingEnv(num_noise_traders=20, num_market_makers=4, num_momentum_traders=2, cache_warmup=True)
+    assert episode_rewards(env, seed=3) == episode_rewards(env, seed=3)
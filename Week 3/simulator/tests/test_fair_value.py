@@ -0,0 +1,12 @@
+import numpy as np
+import pytest
+
+from fair_value import LazyFairValueProcess, RandomWalkProcess
+
+
+@pytest.mark.parametrize("cls", [LazyFairValueProcess, RandomWalkProcess])
+def test_sigma_is_per_unit_of_sim_time(cls):
+    # Same sigma, same volatility per unit time whatever the step length
+    fv = cls(initial_value=0.0, sigma=0.5, dt=0.25, seed=1)
+    path = np.array([fv.step() for _ in range(40_000)])
+    assert np.diff(path[::4]).std() == pytest.approx(0.5, rel=0.03)
@@ -0,0 +1,32 @@
+from actions import PlaceLimit, PlaceMarket
+from agents import RandomAgent
+from engine import MarketEngine
+from environment import MarketEnvironment
+from market_config import MarketConfig
+from order_book import OrderBook
+from risk import RiskGate, RiskLimits
+
+
+def make_env(limits):
+    engine = MarketEngine(OrderBook(), None)
+    env = MarketEnvironment(engine, MarketConfig(), risk=RiskGate(limits))
+    maker, taker = RandomAgent("MAKER"), RandomAgent("TAKER")
+    maker.balance, maker.inventory = 100_000.0, 100
+    taker.balance, taker.inventory = 500.0, 0
+    return engine, env, maker, taker
+
+
+def test_market_order_check_uses_top_of_book(monkeypatch):
+    engine, env, maker, taker = make_env(RiskLimits())
+    env.apply_action(maker, PlaceLimit("SELL", 101, 10))
+    engine.run()
+
+    def no_snapshot():
+        raise AssertionError("pre-trade check built a book snapshot")
+
+    monkeypatch.setattr(engine.order_book, "current_snapshot", no_snapshot)
+    risk = env.risk
+    env.apply_action(taker, PlaceMarket("BUY", 4))  # 404 <= 500
+    env.apply_action(taker, PlaceMarket("BUY", 5))  # 505 > 500
+    assert risk.rejected["cash"] == 1
+    assert sum(order_id.startswith("TAKER") for order_id in risk.orders) == 1
@@ -0,0 +1,27 @@
+from fair_value import LazyFairValueProcess
+from logger import Logger
+from market_config import MarketConfig
+from run_simulation import extract_metrics
+from vector_engine import NoiseFlow, QuoteFlow, VectorMarketEngine
+
+
+def run_vector(duration=20.0, seed=0):
+    flows = [NoiseFlow("NOISE", 1000), QuoteFlow("MM", 100)]
+    fv = LazyFairValueProcess(seed=seed)
+    engine = VectorMarketEngine(flows, fv, MarketConfig(), logger=Logger(), seed=seed)
+    engine.run(duration)
+    return engine
+
+
+def test_logger_records_vector_engine_run():
+    logger = run_vector().logger
+    assert logger.trades
+    assert {row["agent"] for row in logger.inventory} == {"NOISE", "MM"}
+
+
+def test_vector_engine_l1_is_two_sided():
+    # Run with run_simulation defaults: the L1 must be usable for reports
+    engine = run_vector(duration=60.0)
+    assert len(engine.logger.l1) >= 30
+    metrics = extract_metrics(engine.logger)
+    assert metrics["avg_spread"] > 0
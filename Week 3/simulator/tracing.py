@@ -0,0 +1,65 @@
+import json
+import time
+
+
+class TraceWriter:
+    """
+    Streams executed events to a Chrome trace (JSON array format), viewable in
+    chrome://tracing or ui.perfetto.dev. Events are buffered and written every
+    buffer_size records, so memory stays bounded on long runs.
+    """
+
+    def __init__(self, path, buffer_size=10_000, clock=None):
+        self.file = open(path, "w")
+        self.file.write("[\n")
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.first = True
+        self.clock = clock
+        self.origin = time.perf_counter_ns()
+
+    def now(self):
+        return time.perf_counter_ns()
+
+    def record(self, name, category, start_ns, end_ns, sim_time, agent_id=None):
+        if self.clock is not None:
+            sim_time = self.clock.seconds(sim_time)
+        args = {"sim_time": sim_time}
+        if agent_id is not None:
+            args["agent"] = agent_id
+        self.buffer.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start_ns - self.origin) / 1000,  # microseconds
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": 0,
+            "tid": 0,
+            "args": args,
+        })
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        for entry in self.buffer:
+            if not self.first:
+                self.file.write(",\n")
+            self.file.write(json.dumps(entry))
+            self.first = False
+        self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.write("\n]\n")
+        self.file.close()
+
+
+def event_agent_id(event):
+    agent = getattr(event, "agent", None)
+    if agent is not None:
+        return agent.agent_id
+    order = getattr(event, "order", None)
+    if order is not None:
+        return order.order_id.split("-")[0]
+    return None
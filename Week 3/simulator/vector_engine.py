@@ -0,0 +1,315 @@
+import numpy as np
+
+from bus import EventBus, TRADE, SNAPSHOT
+from clock import FloatClock
+from trade import Trade
+
+BUY, SELL = 1, -1
+
+
+class NoiseFlow:
+    # n_agents zero-intelligence traders, as NoiseTraderAgent. Its budget and
+    # inventory checks are applied to the flow's average agent (starting with
+    # cash and inventory), since fills are only known per flow.
+    requotes = False
+
+    def __init__(
+        self,
+        name,
+        n_agents,
+        arrival_rate=1.2,
+        p_market=0.7,
+        max_qty=5,
+        offsets=(-4, 4),
+        cash=10_000,
+        inventory=10
+    ):
+        self.agent_id = name
+        self.n_agents = n_agents
+        self.arrival_rate = arrival_rate
+        self.p_market = p_market
+        self.max_qty = max_qty
+        self.offsets = offsets
+        self.initial_cash = cash
+        self.initial_inventory = inventory
+        self.inventory = 0  # net fills of the whole flow, kept by the engine
+        self.balance = 0.0
+
+    def draw(self, rng, n, fv):
+        side = np.where(rng.random(n) < 0.5, BUY, SELL)
+        market = rng.random(n) < self.p_market
+        qty = rng.integers(1, self.max_qty + 1, n)
+        price = fv + rng.integers(self.offsets[0], self.offsets[1] + 1, n)
+
+        cash = self.initial_cash + self.balance / self.n_agents
+        holdings = self.initial_inventory + self.inventory / self.n_agents
+        ok = np.where(side == BUY, cash >= fv * qty, holdings >= qty)
+        return side[ok], market[ok], price[ok], qty[ok]
+
+
+class QuoteFlow:
+    # n_agents market makers: each arrival posts a bid and an ask around fair
+    # value. Quotes go in after the step's market orders (re-quoting), so
+    # snapshots see the makers' latest quotes rather than a swept book.
+    requotes = True
+
+    def __init__(self, name, n_agents, arrival_rate=0.2, spread=1.0, qty=1):
+        self.agent_id = name
+        self.n_agents = n_agents
+        self.arrival_rate = arrival_rate
+        self.spread = spread
+        self.qty = qty
+        self.inventory = 0
+        self.balance = 0.0
+
+    def draw(self, rng, n, fv):
+        side = np.repeat([BUY, SELL], n)
+        market = np.zeros(2 * n, dtype=bool)
+        half = self.spread / 2
+        price = np.repeat([fv - half, fv + half], n)
+        qty = np.full(2 * n, self.qty)
+        return side, market, price, qty
+
+
+class ArraySnapshot:
+    # Same read interface as BookSnapshot, built from level arrays
+    def __init__(self, bids, asks):
+        self.bids = bids
+        self.asks = asks
+
+    def best_bid(self):
+        return self.bids[0][0] if self.bids else None
+
+    def best_ask(self):
+        return self.asks[0][0] if self.asks else None
+
+
+def _allocate(total, weights):
+    # Split an integer total pro rata to integer weights (largest remainder)
+    share = weights * (total / weights.sum())
+    out = np.floor(share).astype(np.int64)
+    rest = int(total - out.sum())
+    if rest:
+        out[np.argsort(out - share)[:rest]] += 1
+    return out
+
+
+class VectorMarketEngine:
+    """
+    Fixed-step engine for very large homogeneous populations.
+
+    Each step of length dt draws per-flow Poisson arrival counts and the
+    sides, order types, prices and sizes of all arrivals as arrays, adds the
+    limit orders to an array-backed book of per-flow resting volume on a tick
+    grid, uncrosses it with a single-price auction, sweeps the aggregated
+    market orders through the book (pro rata within a level), adds the
+    quotes of re-quoting flows (market makers) and cancels resting volume
+    with probability cancel_prob. Trades and snapshots go out
+    on the same bus topics as MarketEngine, so Logger records the same
+    trades / l1 / l2 / inventory tables (inventory per flow).
+    """
+
+    def __init__(
+        self,
+        flows,
+        fair_value,
+        config,
+        logger=None,
+        dt=0.1,
+        seed=None,
+        levels=2048,
+        cancel_prob=0.01,
+        initial_price=100.0,
+    ):
+        self.flows = list(flows)
+        self.requotes = np.array([flow.requotes for flow in self.flows])
+        self.fair_value = fair_value
+        self.config = config
+        self.dt = dt
+        self.rng = np.random.default_rng(seed)
+        self.cancel_prob = cancel_prob
+        self.tick = config.tick_size
+        self.origin = int(round(initial_price / self.tick)) - levels // 2
+
+        n_flows = len(self.flows)
+        self.bids = np.zeros((n_flows, levels), dtype=np.int64)
+        self.asks = np.zeros((n_flows, levels), dtype=np.int64)
+        self.inventory = np.zeros(n_flows, dtype=np.int64)
+        self.balance = np.zeros(n_flows)
+
+        self.clock = FloatClock()
+        self.time = 0.0
+        self.agents = {flow.agent_id: flow for flow in self.flows}
+        self.bus = EventBus()
+        self.logger = logger
+        if logger is not None:
+            logger.attach(self)
+        if hasattr(fair_value, "attach"):
+            fair_value.attach(self)
+
+    def price(self, level):
+        return (level + self.origin) * self.tick
+
+    def run(self, duration):
+        next_snapshot = 0.0
+        for k in range(int(round(duration / self.dt))):
+            self.time = k * self.dt
+            if self.time >= next_snapshot:
+                self._publish_snapshot()
+                next_snapshot += self.config.snapshot_interval
+            self.step()
+        self.bus.flush()
+
+    def step(self):
+        fv = self.fair_value.get()
+        draws = []
+        for i, flow in enumerate(self.flows):
+            n = self.rng.poisson(flow.arrival_rate * flow.n_agents * self.dt)
+            if n:
+                side, market, price, qty = flow.draw(self.rng, n, fv)
+                draws.append((side, market, price, qty, np.full(len(side), i)))
+        if not draws:
+            self._cancel()
+            return
+
+        side, market, price, qty, owner = (np.concatenate(x) for x in zip(*draws))
+
+        requote = self.requotes[owner]
+        limit = ~market & ~requote
+        self._add_limits(side[limit], price[limit], qty[limit], owner[limit])
+        self._uncross()
+
+        n_flows = len(self.flows)
+        buys = market & (side == BUY)
+        sells = market & (side == SELL)
+        buy_qty = np.bincount(owner[buys], weights=qty[buys], minlength=n_flows).astype(np.int64)
+        sell_qty = np.bincount(owner[sells], weights=qty[sells], minlength=n_flows).astype(np.int64)
+
+        if self.rng.random() < 0.5:
+            self._sweep(buy_qty, BUY)
+            self._sweep(sell_qty, SELL)
+        else:
+            self._sweep(sell_qty, SELL)
+            self._sweep(buy_qty, BUY)
+
+        if requote.any():
+            self._add_limits(side[requote], price[requote], qty[requote], owner[requote])
+            self._uncross()
+
+        self._cancel()
+        self._sync_accounts()
+
+    def _add_limits(self, side, price, qty, owner):
+        ticks = price / self.tick
+        buy = side == BUY
+        level = np.where(buy, np.floor(ticks), np.ceil(ticks)).astype(np.int64) - self.origin
+        np.clip(level, 0, self.bids.shape[1] - 1, out=level)
+        np.add.at(self.bids, (owner[buy], level[buy]), qty[buy])
+        np.add.at(self.asks, (owner[~buy], level[~buy]), qty[~buy])
+
+    def _consume(self, book, levels, volume):
+        # Take `volume` from book levels in priority order; returns the fill
+        # per level and the (flows x levels) quantities taken
+        resting = book[:, levels]
+        totals = resting.sum(axis=0)
+        before = np.cumsum(totals) - totals
+        level_fill = np.clip(volume - before, 0, totals)
+
+        taken = np.where(level_fill == totals, resting, 0)
+        for j in np.flatnonzero((level_fill > 0) & (level_fill < totals)):
+            taken[:, j] = _allocate(level_fill[j], resting[:, j])
+        book[:, levels] -= taken
+        return level_fill, taken
+
+    def _uncross(self):
+        bid_levels = np.flatnonzero(self.bids.sum(axis=0))
+        ask_levels = np.flatnonzero(self.asks.sum(axis=0))
+        if not len(bid_levels) or not len(ask_levels) or bid_levels[-1] < ask_levels[0]:
+            return
+
+        # Single clearing price maximising executed volume over the crossed range
+        lo, hi = ask_levels[0], bid_levels[-1] + 1
+        bid_tot = self.bids[:, lo:hi].sum(axis=0)
+        ask_tot = self.asks[:, lo:hi].sum(axis=0)
+        demand = np.cumsum(bid_tot[::-1])[::-1]
+        supply = np.cumsum(ask_tot)
+        executed = np.minimum(demand, supply)
+        k = int(np.argmax(executed))
+        volume = int(executed[k])
+        price = self.price(lo + k)
+
+        _, bought = self._consume(self.bids, bid_levels[::-1], volume)
+        _, sold = self._consume(self.asks, ask_levels, volume)
+        bought, sold = bought.sum(axis=1), sold.sum(axis=1)
+        self.inventory += bought - sold
+        self.balance += (sold - bought) * price
+        self._publish_trade(price, volume, "AUCTION", "AUCTION")
+
+    def _sweep(self, aggressor_qty, side):
+        volume = int(aggressor_qty.sum())
+        if volume == 0:
+            return
+        book = self.asks if side == BUY else self.bids
+        levels = np.flatnonzero(book.sum(axis=0))
+        if side == SELL:
+            levels = levels[::-1]
+        if not len(levels):
+            return
+
+        level_fill, taken = self._consume(book, levels, volume)
+        prices = self.price(levels)
+        executed = int(level_fill.sum())
+        if executed == 0:
+            return
+
+        passive_qty = taken.sum(axis=1)
+        passive_cash = (taken * prices).sum(axis=1)
+        filled = _allocate(executed, aggressor_qty)
+        notional = float((level_fill * prices).sum())
+        aggressor_cash = notional * filled / executed
+
+        # side: +1 aggressors buy, passive side sells
+        self.inventory += side * (filled - passive_qty)
+        self.balance += side * (passive_cash - aggressor_cash)
+
+        for j in np.flatnonzero(level_fill):
+            if side == BUY:
+                self._publish_trade(prices[j], int(level_fill[j]), "MKT", "BOOK")
+            else:
+                self._publish_trade(prices[j], int(level_fill[j]), "BOOK", "MKT")
+
+    def _cancel(self):
+        for book in (self.bids, self.asks):
+            resting = np.nonzero(book)
+            if len(resting[0]):
+                book[resting] -= self.rng.binomial(book[resting], self.cancel_prob)
+
+    def _sync_accounts(self):
+        for i, flow in enumerate(self.flows):
+            flow.inventory = int(self.inventory[i])
+            flow.balance = float(self.balance[i])
+
+    def _publish_trade(self, price, qty, buy, sell):
+        if TRADE in self.bus.handlers:
+            price = price.item() if hasattr(price, "item") else price
+            trade = Trade(
+                price=price,
+                qty=qty,
+                buy_order_id=f"{buy}-{self.time}",
+                sell_order_id=f"{sell}-{self.time}",
+            )
+            self.bus.publish(TRADE, self.time, trade)
+
+    def snapshot(self):
+        bid_tot = self.bids.sum(axis=0)
+        ask_tot = self.asks.sum(axis=0)
+        bid_levels = np.flatnonzero(bid_tot)[::-1]
+        ask_levels = np.flatnonzero(ask_tot)
+        return ArraySnapshot(
+            [(self.price(i).item(), int(bid_tot[i])) for i in bid_levels],
+            [(self.price(i).item(), int(ask_tot[i])) for i in ask_levels],
+        )
+
+    def _publish_snapshot(self, depth=5):
+        if SNAPSHOT in self.bus.handlers:
+            self.bus.publish(SNAPSHOT, self.time, self.snapshot(), depth)
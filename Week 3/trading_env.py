@@ -5,7 +5,7 @@ from gymnasium import spaces
 import sys
 import os
 import math
-import heapq
+from collections import OrderedDict
 
 # Add the simulator directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'simulator'))
@@ -15,11 +15,15 @@ from engine import MarketEngine
 from environment import MarketEnvironment
 from logger import Logger
 from market_config import MarketConfig
-from fair_value import FairValueProcess
+from fair_value import LazyFairValueProcess
 from agents import NoiseTraderAgent, MarketMakerAgent, MomentumAgent
-from events import AgentArrivalEvent, OrderSubmissionEvent, FairValueUpdateEvent, SnapshotEvent
+from events import AgentArrivalEvent, OrderSubmissionEvent, SnapshotEvent
 from actions import PlaceLimit, PlaceMarket, Cancel
 from order import Order
+from rng import RNGService
+from indicators import SMA
+from risk import RiskGate
+from policy import observations
 
 class TradingEnv(gym.Env):
     """
@@ -35,6 +39,9 @@ class TradingEnv(gym.Env):
                  simulation_time_limit=1800.0, # 30 mins
                  step_duration=1.0, # 1 second per step
                  risk_lambda=0.5, # Risk aversion parameter
+                 cache_warmup=False, # Fork episodes from a warmed-up checkpoint instead of re-simulating it
+                 warmup_cache_size=4, # Checkpoints kept (least recently used seeds are evicted)
+                 rl_risk_limits=None, # risk.RiskLimits for the RL agent's orders (None: unchecked)
                  render_mode=None):
         
         super(TradingEnv, self).__init__()
@@ -45,6 +52,11 @@ class TradingEnv(gym.Env):
         self.sim_time_limit = simulation_time_limit
         self.step_duration = step_duration
         self.risk_lambda = risk_lambda
+        self.cache_warmup = cache_warmup
+        self.warmup_cache_size = warmup_cache_size
+        self._warm_checkpoints = OrderedDict() # seed -> Checkpoint taken after warmup (LRU)
+        self.rl_risk_limits = rl_risk_limits
+        self.rl_risk = None
         
         # Action Space: 0=Hold, 1=Buy, 2=Sell (Fixed quantity 1 for now, Market orders for simplicity or simple limits)
         # Week 3 docs: "0 -> Hold, 1 -> Buy (fixed size), 2 -> Sell (fixed size)"
@@ -87,6 +99,39 @@ class TradingEnv(gym.Env):
         
         # Seed random generators
         self.np_random = np.random.default_rng(seed)
+
+        checkpoint = self._warm_checkpoints.get(seed) if self.cache_warmup else None
+        if checkpoint is None:
+            self._build_market(seed)
+            if self.cache_warmup:
+                self._warm_checkpoints[seed] = self.engine.checkpoint(self.env_wrapper, self.fv)
+                while len(self._warm_checkpoints) > self.warmup_cache_size:
+                    self._warm_checkpoints.popitem(last=False)
+        else:
+            self._warm_checkpoints.move_to_end(seed)
+            # Continue from the shared warmup prefix instead of re-running it;
+            # unseeded resets branch off with fresh randomness like uncached ones
+            fork_seed = None if seed is not None else int(self.np_random.integers(2**63))
+            self.engine, self.env_wrapper, self.fv = checkpoint.fork(fork_seed)
+            self.book = self.engine.order_book
+            self.logger = self.engine.logger
+            self.market_config = self.env_wrapper.config
+            self.agents = list(self.engine.agents.values())
+
+        # Reset RL Agent
+        self.rl_risk = RiskGate(self.rl_risk_limits) if self.rl_risk_limits is not None else None
+        self.rl_inventory = 0
+        self.rl_cash = self.initial_cash
+        self.prev_portfolio_value = self.initial_cash
+        self.peak_portfolio_value = self.initial_cash
+        self.portfolio_history = [self.initial_cash]
+        
+        return self._get_obs(), {}
+
+    def _build_market(self, seed):
+        """
+        Build a fresh market and run the warmup period.
+        """
         import random
         random.seed(seed if seed is not None else 42)
         
@@ -97,7 +142,8 @@ class TradingEnv(gym.Env):
         self.market_config = MarketConfig(tick_size=1.0)
         self.env_wrapper = MarketEnvironment(self.engine, self.market_config)
         
-        self.fv = FairValueProcess(initial_value=100.0, sigma=0.5, seed=seed)
+        self.fv = LazyFairValueProcess(initial_value=100.0, sigma=0.5, dt=1.0, seed=seed)
+        self.fv.attach(self.engine)
         
         # Setup Background Agents
         self.agents = []
@@ -105,55 +151,31 @@ class TradingEnv(gym.Env):
             self.agents.append(NoiseTraderAgent(f"N{i}", self.fv, arrival_rate=1.2))
         
         for i in range(self.num_mm):
-            self.agents.append(MarketMakerAgent(f"MM{i}", self.fv, arrival_rate=0.2, base_spread=1.0, inventory_skew=0.2))
+            self.agents.append(MarketMakerAgent(f"MM{i}", self.fv, arrival_rate=0.2, base_spread=1.0, inventory_skew=0.2, tick_size=self.market_config.tick_size))
 
         for i in range(self.num_mom):
-             self.agents.append(MomentumAgent(f"MOM{i}", window=20, arrival_rate=0.5, max_qty=3, cash=100_000))
+             # One shared SMA of the mid for all momentum agents (computed once per book change)
+             sma = self.env_wrapper.features.indicator(SMA, 20)
+             self.agents.append(MomentumAgent(f"MOM{i}", window=20, arrival_rate=0.5, max_qty=3, cash=100_000, sma=sma))
             
+        RNGService(seed if seed is not None else 42).assign(self.agents)
+
         # Schedule Initial Events
         for agent in self.agents:
             self.engine.agents[agent.agent_id] = agent
-            self.engine.schedule(AgentArrivalEvent(agent.next_event_time(0), agent, self.env_wrapper))
+            self.engine.schedule(AgentArrivalEvent(self.engine.clock.ticks(agent.next_event_time(0)), agent, self.env_wrapper))
 
-        # Schedule Fair Value Updates
-        # We need a recurring event for FV update. In run_simulation it was one event?
-        # No, FairValueUpdateEvent logic probably schedules the next one? 
-        # Checking events.py would confirm, but usually yes. 
-        # Actually in run_simulation: engine.schedule(FairValueUpdateEvent(0, fv, dt=1.0))
-        # We'll just manually step FV in our loop or schedule it.
-        # Let's schedule it to be safe.
-        self.engine.schedule(FairValueUpdateEvent(0, self.fv, dt=1.0))
+        # Fair value is evaluated lazily at engine time, no update events needed
         self.engine.schedule(SnapshotEvent(0, self.env_wrapper, depth=10))
 
-        # Reset RL Agent
-        self.rl_inventory = 0
-        self.rl_cash = self.initial_cash
-        self.prev_portfolio_value = self.initial_cash
-        self.peak_portfolio_value = self.initial_cash
-        self.portfolio_history = [self.initial_cash]
-        
         # Warmup: Run engine for 60 seconds to populate book
-        self._run_engine_until(60.0)
-        
-        return self._get_obs(), {}
+        self._run_engine_until(self.engine.clock.ticks(60.0))
 
     def _run_engine_until(self, target_time):
         """
         Run the engine until the simulation time reaches target_time.
         """
-        while self.engine.event_queue:
-            # peek next event
-            evt_time, _, _ = self.engine.event_queue[0]
-            
-            if evt_time > target_time:
-                break
-                
-            # Pop and execute
-            _, _, event = heapq.heappop(self.engine.event_queue)
-            self.engine.time = evt_time
-            event.execute(self.engine)
-            
-        self.engine.time = target_time
+        self.engine.run_until(target_time)
 
     def step(self, action):
         # 1. Execute RL Action
@@ -177,6 +199,15 @@ class TradingEnv(gym.Env):
         # We will submit it immediately.
         
         rl_order = None
+        risk_rejected = False
+        if action in (1, 2) and self.rl_risk is not None:
+            side = "BUY" if action == 1 else "SELL"
+            ref_price = self.env_wrapper.features.view["best_ask" if action == 1 else "best_bid"]
+            now = self.engine.clock.seconds(self.engine.time)
+            if not self.rl_risk.check(self.agent_id, self.rl_inventory, self.rl_cash, side, ref_price, 1, now):
+                risk_rejected = True
+                action = 0 # Rejected orders are treated as Hold
+
         if action == 1: # BUY
             rl_order = Order(order_id=f"RL-{self.engine.time}", side="BUY", price=None, qty=1, timestamp=self.engine.time)
         elif action == 2: # SELL
@@ -219,7 +250,7 @@ class TradingEnv(gym.Env):
                             self.rl_cash += t.price * t.qty
                             
         # 2. Advance Time (Background Market)
-        next_time = self.engine.time + self.step_duration
+        next_time = self.engine.time + self.engine.clock.ticks(self.step_duration)
         self._run_engine_until(next_time)
 
         # 3. Calculate Reward
@@ -227,12 +258,7 @@ class TradingEnv(gym.Env):
         
         # Mark to Market Portfolio Value
         # Inventory valued at Mid Price
-        snap = self.book.current_snapshot()
-        best_bid = snap.best_bid()
-        best_ask = snap.best_ask()
-        mid_price = None
-        if best_bid is not None and best_ask is not None:
-             mid_price = (best_bid + best_ask) / 2.0
+        mid_price = self.env_wrapper.features.view["mid"]
         
         if mid_price is None:
             mid_price = self.fv.get() # Fallback
@@ -255,7 +281,7 @@ class TradingEnv(gym.Env):
         terminated = False
         truncated = False
         
-        if self.engine.time >= self.sim_time_limit:
+        if self.engine.clock.seconds(self.engine.time) >= self.sim_time_limit:
             terminated = True
             
         # Bankrupt check
@@ -270,69 +296,29 @@ class TradingEnv(gym.Env):
             "portfolio_value": current_portfolio_value,
             "inventory": self.rl_inventory,
             "pnl_step": pnl,
-            "drawdown": self.peak_portfolio_value - current_portfolio_value
+            "drawdown": self.peak_portfolio_value - current_portfolio_value,
+            "risk_rejected": risk_rejected
         }
         
         return obs, float(reward), terminated, truncated, info
 
     def _get_obs(self, mid_price=None):
-        snapshot = self.book.current_snapshot()
+        # Shared with the background agents, cached per book version
+        features = self.env_wrapper.features.view
+        snapshot = features["snapshot"]
         
         if mid_price is None:
-            best_bid = snapshot.best_bid()
-            best_ask = snapshot.best_ask()
-            if best_bid is not None and best_ask is not None:
-                mid_price = (best_bid + best_ask) / 2.0
-            else:
+            mid_price = features["mid"]
+            if mid_price is None:
                 mid_price = 100.0
             
-        # Feature Engineering (Vectorized)
-        # Bids: Top 5 prices (relative to mid) and volumes (log)
-        # Asks: Top 5 prices (relative to mid) and volumes (log)
-        
-        def safe_log(x):
-            return np.log(x + 1)
-            
-        # snapshot.bids is list of (price, qty)
-        bids = snapshot.bids[:5] 
-        asks = snapshot.asks[:5] 
-        
-        # Pad if less than 5
-        bid_feats = np.zeros(10) # 5 prices, 5 vols
-        ask_feats = np.zeros(10)
-        
-        for i, b in enumerate(bids):
-            p = b[0]
-            v = b[1]
-            bid_feats[i] = (p - mid_price) / mid_price # Relative Price
-            bid_feats[i+5] = safe_log(v) # Log Vol
-            
-        for i, a in enumerate(asks):
-            p = a[0]
-            v = a[1]
-            ask_feats[i] = (p - mid_price) / mid_price
-            ask_feats[i+5] = safe_log(v)
-            
-        # Global State
-        # Inventory (normalized by max_inventory assumption, say 100)
-        inv_feat = self.rl_inventory / 100.0 
-        
-        # Cash? Maybe insignificant compared to Invested? 
-        # Usually Inventory + Recent Returns
-        # Let's use Cash / Initial
-        cash_feat = self.rl_cash / self.initial_cash
-        
-        # Create vector
-        obs = np.concatenate([bid_feats, ask_feats, [inv_feat, cash_feat, 0.0]]) # 23 dim, last one unused/padding
-        
-        # Normalize/Clip to reasonable range 
-        # Since we use Box(-inf, inf), we don't strictly need to clip, 
-        # provides raw relative features.
-        
-        return obs.astype(np.float32)
+        # Feature Engineering (shared with policy.PolicyAgent populations)
+        # Top 5 bid / ask prices relative to mid and their log volumes,
+        # inventory / 100, cash / initial cash, padding
+        return observations(snapshot, mid_price, [self.rl_inventory], [self.rl_cash], self.initial_cash)[0]
 
     def render(self, mode='human'):
-        print(f"Time: {self.engine.time:.2f} | PF: {self.prev_portfolio_value:.2f} | Inv: {self.rl_inventory}")
+        print(f"Time: {self.engine.clock.seconds(self.engine.time):.2f} | PF: {self.prev_portfolio_value:.2f} | Inv: {self.rl_inventory}")
 
 # Self-Check
 if __name__ == "__main__":